@@ -0,0 +1,313 @@
+"""
+Benchmarks and physics regression checks
+========================================
+
+Times the hot paths of jwst_modified_inertia at several input sizes
+(scalar, 10^3 and 10^6 points) plus the full run_analysis and
+make_figures runs, and records the time per call, throughput and peak
+traced memory of each. The results are compared against baseline.json:
+a benchmark fails when it is slower than the baseline by more than
+--tolerance (fractional) or allocates more than --memory-tolerance more
+at peak.
+
+Three physics checks guard against speedups that change the numbers:
+    - the Key Result table of README.md (values rounded as printed there,
+      so compared to --readme-rtol);
+    - the full-precision section 6 values stored in the baseline
+      (compared to 1e-6);
+    - the reduced evaluator of fast_collapse.py against
+      collapse_timescale_batch over a wide box (compared to 1e-12).
+
+Usage (from the repository root):
+    python benchmarks/bench.py                 # compare against the baseline
+    python benchmarks/bench.py --update        # rewrite the baseline
+    python benchmarks/bench.py -k collapse     # only matching benchmarks
+
+Each timing is normalised by a fixed NumPy/Python calibration workload
+measured just before it, which absorbs most of the drift in machine
+speed between and during runs; the baseline should still be regenerated with
+--update on the machine the comparison runs on. Exit status is 1 on any
+failure.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+import jwst_modified_inertia as jmi  # noqa: E402
+from jwst_modified_inertia.fast_collapse import (  # noqa: E402
+    CollapseEvaluator, FAST_FIELDS,
+)
+from jwst_modified_inertia.geom_fit import FormationLikelihood  # noqa: E402
+
+BASELINE = os.path.join(HERE, 'baseline.json')
+SIZES = {'scalar': None, '1e3': 1_000, '1e6': 1_000_000}
+
+# README Key Result columns and the section 6 quantities they show
+README_COLUMNS = ('t_ff_std_Myr', 't_ff_mod_geom_Myr', 'n_collapses')
+
+
+def _redshifts(n):
+    if n is None:
+        return 10.0
+    return np.random.default_rng(1).uniform(0.0, 20.0, n)
+
+
+def _masses(n):
+    if n is None:
+        return 1e10 * jmi.Msun
+    return 10**np.random.default_rng(2).uniform(8.0, 12.0, n) * jmi.Msun
+
+
+def _accelerations(n):
+    if n is None:
+        return 1e-12
+    return 10**np.random.default_rng(3).uniform(-14.0, -8.0, n)
+
+
+def _run_analysis():
+    with open(os.devnull, 'w') as fh, contextlib.redirect_stdout(fh):
+        jmi.run_analysis()
+
+
+def _make_figures():
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.devnull, 'w') as fh, contextlib.redirect_stdout(fh):
+            jmi.make_figures(path=os.path.join(tmp, 'fig.png'))
+
+
+def benchmarks():
+    """(name, number of points, callable) for every benchmark."""
+    cases = []
+    for label, n in SIZES.items():
+        z = _redshifts(n)
+        M = _masses(n)
+        g = _accelerations(n)
+        points = 1 if n is None else n
+        collapse = (jmi.collapse_timescale if n is None
+                    else jmi.collapse_timescale_batch)
+        cases += [
+            (f'E[{label}]', points, lambda z=z: jmi.E(z)),
+            (f'H[{label}]', points, lambda z=z: jmi.H(z)),
+            (f'a0[{label}]', points, lambda z=z: jmi.a0(z)),
+            (f'age_at_z[{label}]', points, lambda z=z: jmi.age_at_z(z)),
+            (f'growth_factor[{label}]', points, lambda z=z: jmi.growth_factor(z)),
+            (f'D_norm[{label}]', points, lambda z=z: jmi.D_norm(z)),
+            (f'modified_acceleration[{label}]', points,
+             lambda g=g, z=z: jmi.modified_acceleration(g, z)),
+            (f'collapse_timescale[{label}]', points,
+             lambda f=collapse, M=M, z=z: f(M, z)),
+            (f'max_stellar_mass_standard[{label}]', points,
+             lambda z=np.clip(z, 0.0, 20.0): jmi.max_stellar_mass_standard(z)),
+            (f'CollapseEvaluator[{label}]', points,
+             lambda ev=CollapseEvaluator(M, z): ev(5.0)),
+        ]
+    walkers = np.random.default_rng(4).uniform([1.0, -2.0, 0.0], [30.0, 0.0, 2.0],
+                                               (1_000, 3))
+    cases += [
+        ('FormationLikelihood[1e3 walkers]', walkers.shape[0],
+         lambda L=FormationLikelihood(params=('geom', 'log10_sfe', 'log10_overdensity')),
+         w=walkers: L(w)),
+        ('run_analysis[full]', 1, _run_analysis),
+        ('make_figures[full]', 1, _make_figures),
+    ]
+    return cases
+
+
+def _calibration():
+    """Fixed workload timed next to the benchmarks to normalise them."""
+    x = np.random.default_rng(0).random(100_000)
+    np.sort(x)
+    np.exp(x).sum()
+    sum(range(20_000))
+
+
+def measure(fn, min_time=0.2, repeat=7):
+    """Best time per call in seconds, and peak traced memory in bytes."""
+    fn()    # warm up: builds the cosmology tables
+    t0 = time.perf_counter()
+    fn()
+    single = time.perf_counter() - t0
+    number = max(1, int(min_time / repeat / max(single, 1e-9)))
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / number)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def section6_values():
+    """Section 6 quantities per galaxy, from run_analysis."""
+    with open(os.devnull, 'w') as fh, contextlib.redirect_stdout(fh):
+        results = jmi.run_analysis(sections=(6,))
+    return {name: {'t_ff_std_Myr': float(r['t_ff_std_Myr']),
+                   't_ff_mod_geom_Myr': float(r['t_ff_mod_geom_Myr']),
+                   'n_collapses': float(t_avail / r['t_ff_mod_geom_Myr'])}
+            for name, z, logM, r, t_avail, t_universe in results}
+
+
+def readme_table(path=os.path.join(ROOT, 'README.md')):
+    """Key Result rows of README.md: {galaxy: {column: value}}."""
+    table = {}
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            cells = [c.strip().strip('*') for c in line.strip().strip('|').split('|')]
+            if len(cells) != 5 or not re.fullmatch(r'[\d.]+', cells[2]):
+                continue
+            table[cells[0]] = dict(zip(README_COLUMNS, map(float, cells[2:])))
+    return table
+
+
+def check_physics(values, baseline, readme_rtol):
+    """Failure messages from the README and baseline comparisons."""
+    failures = []
+    readme = readme_table()
+    if not readme:
+        failures.append("README.md: Key Result table not found")
+    for name, expected in readme.items():
+        got = values.get(name)
+        if got is None:
+            failures.append(f"README galaxy {name} missing from run_analysis")
+            continue
+        for col, want in expected.items():
+            if not np.isclose(got[col], want, rtol=readme_rtol, atol=0):
+                failures.append(f"{name} {col} = {got[col]:.4g}, README says {want:g}")
+
+    for name, expected in (baseline or {}).items():
+        for col, want in expected.items():
+            got = values.get(name, {}).get(col, np.nan)
+            if not np.isclose(got, want, rtol=1e-6, atol=0):
+                failures.append(f"{name} {col} = {got!r}, baseline {want!r}")
+    return failures
+
+
+def check_fast_collapse(n=100_000, rtol=1e-12):
+    """Failure messages from comparing CollapseEvaluator with the exact call."""
+    rng = np.random.default_rng(4)
+    M = 10**rng.uniform(5.0, 16.0, n) * jmi.Msun
+    z = rng.uniform(0.0, 50.0, n)
+    delta = 10**rng.uniform(-1.0, 4.0, n)
+    failures = []
+    for g in (4.0, 6.0, 9.0):
+        # GEOM as a per-call parameter against GEOM in the cosmology
+        exact = jmi.collapse_timescale_batch(M, z, delta, fields=FAST_FIELDS,
+                                             cosmo=jmi.PLANCK18.replace(GEOM=g))
+        fast = CollapseEvaluator(M, z, jmi.PLANCK18)(delta, g)
+        for k in FAST_FIELDS:
+            err = np.max(np.abs(fast[k] / exact[k] - 1))
+            if not err <= rtol:
+                failures.append(f"CollapseEvaluator {k} (GEOM = {g:g}): "
+                                f"relative error {err:.2g}")
+    return failures
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split('\n\n')[1],
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument('--update', action='store_true',
+                   help="write the measurements to the baseline file")
+    p.add_argument('--baseline', default=BASELINE, help="baseline JSON file")
+    p.add_argument('--tolerance', type=float, default=1.0,
+                   help="allowed fractional slowdown (default: 1.0, i.e. 2x; "
+                   "~0.2 is practical on a quiet machine)")
+    p.add_argument('--memory-tolerance', type=float, default=0.25,
+                   help="allowed fractional increase of peak memory (default: 0.25)")
+    p.add_argument('--readme-rtol', type=float, default=0.02,
+                   help="relative tolerance against the rounded README table")
+    p.add_argument('-k', dest='pattern', help="only benchmarks containing this string")
+    p.add_argument('-o', '--output', help="also write the measurements to this JSON file")
+    args = p.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+    base_bench = baseline.get('benchmarks', {})
+
+    failures = []
+    values = section6_values()
+    failures += check_physics(values, None if args.update else baseline.get('physics'),
+                              args.readme_rtol)
+    failures += check_fast_collapse()
+
+    measured = {}
+    print(f"{'benchmark':<36s} {'time/call':>11s} {'points/s':>10s} "
+          f"{'peak MiB':>9s} {'vs base':>8s}")
+    print("-" * 78)
+    for name, points, fn in benchmarks():
+        if args.pattern and args.pattern not in name:
+            continue
+        calibration = measure(_calibration, min_time=0.05)[0]
+        seconds, peak = measure(fn)
+        measured[name] = {'seconds': seconds, 'points': points,
+                          'throughput': points / seconds, 'peak_bytes': peak,
+                          'calibration_seconds': calibration}
+        ref = base_bench.get(name)
+        status = ''
+        if ref and not args.update:
+            ratio = ((seconds / calibration)
+                     / (ref['seconds'] / ref.get('calibration_seconds', calibration)))
+            status = f"{ratio:7.2f}x"
+            if ratio > 1 + args.tolerance:
+                failures.append(f"{name}: {ratio:.2f}x slower than baseline")
+                status += ' SLOW'
+            # 64 KiB slack so that tiny allocations do not trip the check
+            if peak > ref['peak_bytes'] * (1 + args.memory_tolerance) + 2**16:
+                failures.append(f"{name}: peak memory {peak / 2**20:.1f} MiB, "
+                                f"baseline {ref['peak_bytes'] / 2**20:.1f} MiB")
+                status += ' MEM'
+        print(f"{name:<36s} {seconds * 1e3:9.3f}ms {points / seconds:10.3g} "
+              f"{peak / 2**20:9.2f} {status:>8s}")
+
+    record = {
+        'machine': {'platform': platform.platform(),
+                    'python': platform.python_version(),
+                    'numpy': np.__version__},
+        'benchmarks': measured,
+        'physics': values,
+    }
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(record, fh, indent=1)
+    if args.update:
+        if args.pattern and base_bench:
+            # Keep the entries that were not re-measured
+            record['benchmarks'] = {**base_bench, **measured}
+        with open(args.baseline, 'w') as fh:
+            json.dump(record, fh, indent=1)
+            fh.write('\n')
+        print(f"\nBaseline written: {args.baseline}")
+
+    if failures:
+        print("\nFAILED:")
+        for f in failures:
+            print(f"  {f}")
+        return 1
+    print("\nOK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
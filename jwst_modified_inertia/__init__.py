@@ -0,0 +1,31 @@
+"""
+JWST massive early galaxies under modified inertia
+==================================================
+
+    core                 constants, Cosmology, cosmological and modified-
+                         inertia physics, the JWST sample
+    analysis             printed analysis sections 1-6
+    plotting             paper figure (matplotlib imported on render only)
+    cli                  python -m jwst_modified_inertia
+    cosmic_time, growth, fast_collapse, halo_mass_function, modified_growth,
+    infall, interpolation, montecarlo, catalogue, thresholds, grid,
+    geom_fit, sparc, survey, result_cache
+
+Importing the package loads NumPy and nothing else, and does no
+computation; SciPy and the extension modules are imported on first use. The
+names below are re-exported from core, analysis and plotting. Module
+parameters (H0, Om, GEOM, INTERP, ...) are read from
+jwst_modified_inertia.core.
+"""
+
+from .core import (
+    c, G, H0_km, Mpc, H0, kpc, Msun, Gyr, Myr, Om, Or, OL, Ob, fb, GEOM, INTERP,
+    a0_now, Cosmology, get_cosmology, PLANCK18,
+    E, H, a0, age_at_z, lookback_time, redshift_at_age, time_between,
+    growth_factor, D_norm, growth_rate, peak_height, jwst_galaxies,
+    sharing_function, modified_acceleration, COLLAPSE_FIELDS,
+    collapse_timescale_batch, collapse_record_to_structured,
+    collapse_timescale, VERDICTS, verdict_index, max_stellar_mass_standard,
+)
+from .analysis import SECTIONS, print_header, analysis_data, run_analysis
+from .plotting import FigureData, figure_data, render_figures, make_figures
@@ -0,0 +1,354 @@
+"""
+Printed analysis (sections 1-6)
+===============================
+
+analysis_data computes the numerical tables behind each section of the
+report as columnar arrays (optionally through the on-disk result cache);
+run_analysis prints the selected sections from them. The command line
+(cli.py) uses the same tables for its JSON and CSV output.
+
+Sections and the tables they use:
+    1  a0               a_0(z), H(z) and cosmic time
+    2  galaxies         collapse analysis of each JWST galaxy
+    3  max_mass         LCDM maximum stellar mass vs redshift
+    4  cloud            collapse vs available time for a 10^10 Msun cloud
+    5  growth,          standard growth / peak heights, and the
+       modified_growth  nonlinear redshift of the modified growth
+    6  galaxies         summary verdicts
+"""
+
+import numpy as np
+
+from .core import (
+    Msun, Myr, jwst_galaxies, get_cosmology, E, a0, age_at_z, time_between,
+    D_norm, peak_height, COLLAPSE_FIELDS, collapse_timescale_batch,
+    VERDICTS, verdict_index, max_stellar_mass_standard,
+)
+from .instrument import section
+from .interpolation import INTERPOLATIONS
+from .result_cache import cached
+
+SECTIONS = (1, 2, 3, 4, 5, 6)
+
+SECTION_TABLES = {
+    1: ('a0',),
+    2: ('galaxies',),
+    3: ('max_mass',),
+    4: ('cloud',),
+    5: ('growth', 'modified_growth'),
+    6: ('galaxies',),
+}
+
+
+def print_header(title):
+    print(f"\n{'='*70}")
+    print(f"  {title}")
+    print(f"{'='*70}\n")
+
+
+@section('analysis_data')
+def analysis_data(galaxies=None, cosmo=None, sfe=0.1, overdensity=5.0,
+                  z_start=30.0, sections=SECTIONS, cache=None):
+    """
+    Numerical tables behind the sections of run_analysis.
+
+    Parameters:
+        galaxies: list in jwst_galaxies format (default: jwst_galaxies)
+        cosmo: Cosmology (default: module parameters)
+        sfe: star formation efficiency of the galaxy progenitors
+        overdensity: cloud overdensity at turnaround
+        z_start: redshift at which the time budget starts
+        sections: section numbers whose tables are computed
+        cache: optional result_cache.ResultCache; the tables are stored
+               under a key built from all of the above and the code version
+    Returns:
+        dict of tables (see SECTION_TABLES), each a dict of 1-D arrays
+    """
+    if galaxies is None:
+        galaxies = jwst_galaxies
+    cosmo = get_cosmology(cosmo)
+    tables = sorted({t for s in sections for t in SECTION_TABLES[s]})
+
+    def compute():
+        out = {}
+        if 'a0' in tables:
+            with section('a0'):
+                z = np.array([0, 2, 4, 6, 8, 10, 12, 14, 17, 20])
+                out['a0'] = {'z': z, 'E': E(z, cosmo), 'a0': a0(z, cosmo),
+                             't_Myr': age_at_z(z, cosmo) / Myr}
+
+        if 'galaxies' in tables:
+            with section('galaxies'):
+                # All galaxies in one batch call
+                z = np.array([g[1] for g in galaxies], dtype=float)
+                logM = np.array([g[2] for g in galaxies], dtype=float)
+                M_bary = 10**logM * Msun / sfe
+                r = collapse_timescale_batch(M_bary, z, overdensity, cosmo=cosmo)
+                t_universe = age_at_z(z, cosmo) / Myr
+                t_avail = t_universe - age_at_z(z_start, cosmo) / Myr
+                out['galaxies'] = {
+                    'name': np.array([g[0] for g in galaxies], dtype=str),
+                    'log10_Mstar': logM, **r,
+                    't_universe_Myr': t_universe, 't_avail_Myr': t_avail,
+                    'n_collapses': t_avail / r['t_ff_mod_geom_Myr']}
+
+        if 'max_mass' in tables:
+            with section('max_mass'):
+                z = np.array([6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 17, 20])
+                Mstar_100 = max_stellar_mass_standard(z, sfe=1.0, cosmo=cosmo)[0]
+                out['max_mass'] = {'z': z, 't_Myr': age_at_z(z, cosmo) / Myr,
+                                   'log10_Mstar_10': np.log10(0.1 * Mstar_100 / Msun),
+                                   'log10_Mstar_100': np.log10(Mstar_100 / Msun),
+                                   'nu': peak_height(z, cosmo=cosmo)}
+
+        if 'cloud' in tables:
+            with section('cloud'):
+                z = np.array([6, 8, 10, 12, 14, 17, 20])
+                r = collapse_timescale_batch(
+                    1e10 * Msun, z, overdensity,
+                    fields=('t_ff_std_Myr', 't_ff_mod_geom_Myr', 'eta'), cosmo=cosmo)
+                t_avail = time_between(z, z_start, cosmo) / Myr
+                out['cloud'] = {'z': z, 't_avail_Myr': t_avail, **r,
+                                'n_collapses': t_avail / r['t_ff_mod_geom_Myr']}
+
+        if 'growth' in tables:
+            with section('growth'):
+                z = np.array([2, 4, 6, 8, 10, 12, 14])
+                out['growth'] = {'z': z, 'D': D_norm(z, cosmo),
+                                 'nu': peak_height(z, cosmo=cosmo)}
+
+        if 'modified_growth' in tables:
+            with section('modified_growth'):
+                from .halo_mass_function import halo_mass_function
+                from .modified_growth import modified_growth_table
+
+                logM = np.array([9, 10, 11, 12, 13])
+                M = 10.0**logM
+                table = modified_growth_table(cosmo)
+                out['modified_growth'] = {
+                    'log10_M': logM, 'z_nl': table.nonlinear_redshift(M),
+                    'nu_std_z12': halo_mass_function(cosmo).peak_height(M, 12.0),
+                    'nu_mod_z12': table.peak_height(M, 12.0)}
+
+        return out
+
+    return cached(cache, 'analysis', compute, cosmology=cosmo,
+                  galaxies=galaxies, sfe=sfe, overdensity=overdensity,
+                  z_start=z_start, tables=tables)
+
+
+@section('run_analysis')
+def run_analysis(galaxies=None, cosmo=None, sections=SECTIONS, cache=None):
+    """
+    Run the analysis and print the selected sections.
+
+    Parameters:
+        galaxies: list in jwst_galaxies format (default: jwst_galaxies);
+                  see catalogue.load_galaxies for reading one from disk
+        cosmo: Cosmology (default: module parameters)
+        sections: section numbers to print (default: all)
+        cache: optional result_cache.ResultCache for the computed tables
+    Returns:
+        list of (name, z, logM, collapse record, t_avail, t_universe),
+        one per galaxy
+    """
+    if galaxies is None:
+        galaxies = jwst_galaxies
+    cosmo = get_cosmology(cosmo)
+    a0_now = cosmo.a0_now
+    z_start = 30.0
+    # The galaxy table is always needed for the returned results
+    data = analysis_data(galaxies, cosmo, z_start=z_start,
+                         sections=sorted(set(sections) | {2}), cache=cache)
+
+    print(f"a_0(z=0) = cH_0/{cosmo.GEOM:g} = {a0_now:.2e} m/s^2")
+    print(f"  (cf. Milgrom a_0 = 1.2e-10 m/s^2, ratio = {a0_now/1.2e-10:.2f})")
+
+    results = []
+    d = data['galaxies']
+    for i, (name, z, logM, logM_err, ref, notes) in enumerate(galaxies):
+        r = {k: d[k][i] for k in COLLAPSE_FIELDS}
+        results.append((name, z, logM, r, d['t_avail_Myr'][i],
+                        d['t_universe_Myr'][i]))
+
+    # ---------------------------------------------------------
+    # 1. a_0(z) evolution
+    # ---------------------------------------------------------
+    if 1 in sections:
+        print_header(f"1. CRITICAL ACCELERATION a_0(z) = cH(z)/{cosmo.GEOM:g}")
+        print(f"{'z':>4s}  {'H(z)/H0':>8s}  {'a0(z) [m/s^2]':>14s}  {'a0(z)/a0(0)':>12s}  {'t(z) [Myr]':>11s}")
+        print("-" * 60)
+
+        d = data['a0']
+        for z, Ez, a0z, t in zip(d['z'], d['E'], d['a0'], d['t_Myr']):
+            print(f"{z:4d}  {Ez:8.1f}  {a0z:14.2e}  {a0z/a0_now:12.1f}  {t:11.0f}")
+
+    # ---------------------------------------------------------
+    # 2. Analysis of each JWST galaxy
+    # ---------------------------------------------------------
+    if 2 in sections:
+        print_header("2. JWST GALAXY COLLAPSE ANALYSIS")
+
+        for i, (name, z, logM, r, t_avail, t_universe) in enumerate(results):
+            print(f"--- {name} (z={z}, log M*={logM}) ---")
+            print(f"  Progenitor baryonic mass: {r['M_baryonic']/Msun:.1e} Msun")
+            print(f"  Cloud radius at turnaround: {r['R_kpc']:.1f} kpc")
+            print(f"  Edge gravitational accel: {r['g_edge']:.2e} m/s^2")
+            print(f"  a_0(z={z}): {r['a0_z']:.2e} m/s^2")
+            print(f"  g/a_0 = {r['g_over_a0']:.2e}  (deep modified regime: << 1)")
+            print(f"  Modified accel (deep-MOND): {r['a_mod']:.2e} m/s^2")
+            print(f"  Enhancement factor eta: {r['eta']:.1f}")
+            print(f"  Standard free-fall: {r['t_ff_std_Myr']:.0f} Myr")
+            print(f"  Modified (sqrt eta): {r['t_ff_mod_eta_Myr']:.1f} Myr")
+            print(f"  Modified (const accel): {r['t_ff_mod_const_Myr']:.1f} Myr")
+            print(f"  Modified (geometric mean): {r['t_ff_mod_geom_Myr']:.1f} Myr")
+            print(f"  Age of universe: {t_universe:.0f} Myr")
+            print(f"  Time available (from z={z_start:g}): {t_avail:.0f} Myr")
+            can_form = r['t_ff_mod_geom_Myr'] < t_avail
+            can_form_std = r['t_ff_std_Myr'] < t_avail
+            print(f"  Standard collapse in time? {'YES' if can_form_std else 'NO'}")
+            print(f"  Modified collapse in time? {'YES' if can_form else 'NO'}")
+            print(f"  Number of collapse times available: {data['galaxies']['n_collapses'][i]:.1f}")
+            print()
+
+    # ---------------------------------------------------------
+    # 3. Mass-redshift comparison
+    # ---------------------------------------------------------
+    if 3 in sections:
+        print_header("3. MAXIMUM STELLAR MASS vs REDSHIFT")
+        print(f"{'z':>4s}  {'t [Myr]':>8s}  {'LCDM max (SFE=10%)':>20s}  {'LCDM max (SFE=100%)':>21s}  {'LCDM nu=4':>10s}")
+        print("-" * 75)
+
+        d = data['max_mass']
+        for z, t, M10, M100, nu in zip(d['z'], d['t_Myr'], d['log10_Mstar_10'],
+                                       d['log10_Mstar_100'], d['nu']):
+            print(f"{z:4d}  {t:8.0f}  {M10:20.1f}  {M100:21.1f}  {nu:10.1f}")
+
+    # ---------------------------------------------------------
+    # 4. Key prediction: t_collapse(z) vs t_available(z)
+    # ---------------------------------------------------------
+    if 4 in sections:
+        print_header("4. COLLAPSE TIME vs AVAILABLE TIME")
+        print("For a 10^10 Msun baryonic cloud (-> 10^9 Msun galaxy at 10% SFE):")
+        print()
+        print(f"{'z':>4s}  {'t_avail [Myr]':>13s}  {'t_ff,std [Myr]':>14s}  {'t_ff,mod [Myr]':>14s}  {'eta':>7s}  {'N_collapses':>11s}  {'Feasible?':>10s}")
+        print("-" * 85)
+
+        d = data['cloud']
+        for z, t_avail, t_std, t_mod, eta, n_coll in zip(
+                d['z'], d['t_avail_Myr'], d['t_ff_std_Myr'],
+                d['t_ff_mod_geom_Myr'], d['eta'], d['n_collapses']):
+            feasible = "YES" if n_coll >= 1.0 else "NO"
+            print(f"{z:4d}  {t_avail:13.0f}  {t_std:14.0f}  {t_mod:14.1f}  {eta:7.1f}  {n_coll:11.1f}  {feasible:>10s}")
+
+    # ---------------------------------------------------------
+    # 5. Growth factor enhancement analysis
+    # ---------------------------------------------------------
+    if 5 in sections:
+        print_header("5. GROWTH FACTOR / PEAK HEIGHT ANALYSIS")
+        print("Standard LCDM peak heights for 10^11 Msun halo (sigma_0 ~ 2):")
+        print()
+        print(f"{'z':>4s}  {'D(z)/D(0)':>10s}  {'nu (std)':>9s}  {'Assessment':>30s}")
+        print("-" * 60)
+        d = data['growth']
+        for z, Dz, nu in zip(d['z'], d['D'], d['nu']):
+            if nu < 3:
+                assess = "Common"
+            elif nu < 5:
+                assess = "Rare but expected"
+            elif nu < 7:
+                assess = "Very rare"
+            elif nu < 10:
+                assess = "Essentially impossible"
+            else:
+                assess = "IMPOSSIBLE (>10 sigma)"
+            print(f"{z:4d}  {Dz:10.4f}  {nu:9.1f}  {assess:>30s}")
+
+        print(f"\nRequired growth enhancement to bring nu(z=12) to target:")
+        Dz12 = d['D'][d['z'] == 12][0]
+        for nu_target in [3.0, 4.0, 5.0]:
+            D_needed = 1.686 / (2.0 * nu_target)
+            enhancement = D_needed / Dz12
+            print(f"  nu = {nu_target}: need D(z)/D(0) = {D_needed:.3f}, enhancement = {enhancement:.2f}x")
+
+        from .modified_growth import Z_DECOUPLING
+
+        print(f"\nModified-inertia growth from decoupling (z = {Z_DECOUPLING:g}), "
+              f"modified_growth.py:")
+        print()
+        print(f"{'log M':>6s}  {'z_nl':>7s}  {'nu (std, z=12)':>15s}  {'nu (mod, z=12)':>15s}")
+        print("-" * 50)
+        d = data['modified_growth']
+        for logM_h, z_nl, n_s, n_m in zip(d['log10_M'], d['z_nl'], d['nu_std_z12'],
+                                          d['nu_mod_z12']):
+            z_nl = f"{z_nl:7.0f}" if np.isfinite(z_nl) else f"{'-':>7s}"
+            n_m = f"{n_m:15.1f}" if np.isfinite(n_m) else f"{'nonlinear':>15s}"
+            print(f"{logM_h:6d}  {z_nl}  {n_s:15.1f}  {n_m}")
+        print("(z_nl: sigma_mod reaches 1, where linear theory ends; both nu use")
+        print(" sigma(M) of halo_mass_function.py instead of sigma_0 ~ 2)")
+
+    # ---------------------------------------------------------
+    # 6. Summary table for paper
+    # ---------------------------------------------------------
+    if 6 in sections:
+        print_header("6. SUMMARY: CAN MODIFIED INERTIA EXPLAIN EACH JWST GALAXY?")
+        print(f"{'Galaxy':>20s}  {'z':>5s}  {'logM*':>6s}  {'g/a0':>8s}  {'eta':>7s}  {'t_avail':>8s}  {'t_coll,mod':>10s}  {'N_coll':>7s}  {'Verdict':>10s}")
+        print("-" * 95)
+
+        for name, z, logM, r, t_avail, t_universe in results:
+            t_mod = r['t_ff_mod_geom_Myr']
+            n_coll = t_avail / t_mod
+            verdict = VERDICTS[verdict_index(n_coll)]
+            print(f"{name:>20s}  {z:5.1f}  {logM:6.1f}  {r['g_over_a0']:8.2e}  {r['eta']:7.1f}  {t_avail:7.0f} My  {t_mod:8.1f} My  {n_coll:7.1f}  {verdict:>10s}")
+
+        print("\nVerdicts: EASY = multiple collapses possible, FEASIBLE = at least one, TIGHT = marginal")
+
+    return results
+
+
+def interpolation_comparison(interps=None, galaxies=None, cosmo=None, sfe=0.1,
+                             overdensity=5.0, z_start=30.0, cache=None):
+    """
+    Section 6 galaxy table under several interpolating functions.
+
+    Parameters:
+        interps: names for interpolation.get_interpolation, e.g.
+                 ['simple', 'rar', 'n:3'] (default: every registered
+                 function without a parameter)
+        galaxies, cosmo, sfe, overdensity, z_start, cache: as analysis_data;
+                 cosmo.interp is replaced by each name in turn
+    Returns:
+        dict mapping each name to its 'galaxies' table
+    """
+    if interps is None:
+        interps = [k for k, (_, param) in INTERPOLATIONS.items() if param is None]
+    cosmo = get_cosmology(cosmo)
+    return {name: analysis_data(galaxies, cosmo.replace(interp=name), sfe,
+                                overdensity, z_start, sections=(6,),
+                                cache=cache)['galaxies']
+            for name in interps}
+
+
+def print_interpolation_comparison(tables):
+    """Print interpolation_comparison tables: t_coll,mod, N_coll and verdict."""
+    print_header("INTERPOLATING FUNCTION COMPARISON (see interpolation.py)")
+    names = list(tables)
+    first = tables[names[0]]
+    blocks = (
+        ("Modified collapse time t_coll,mod [Myr]",
+         lambda t, i: f"{t['t_ff_mod_geom_Myr'][i]:12.1f}"),
+        ("Collapse times available N_coll",
+         lambda t, i: f"{t['n_collapses'][i]:12.2f}"),
+        ("Verdict",
+         lambda t, i: f"{VERDICTS[verdict_index(t['n_collapses'][i])]:>12s}"),
+    )
+    for k, (title, cell) in enumerate(blocks):
+        if k:
+            print()
+        print(title)
+        print(f"{'Galaxy':>20s}  {'z':>5s}  {'logM*':>6s}" +
+              "".join(f"  {n:>12s}" for n in names))
+        print("-" * (35 + 14 * len(names)))
+        for i, gal in enumerate(first['name']):
+            print(f"{gal:>20s}  {first['z'][i]:5.1f}  {first['log10_Mstar'][i]:6.1f}" +
+                  "".join(f"  {cell(tables[n], i)}" for n in names))
@@ -0,0 +1,183 @@
+"""
+Command line
+============
+
+    python -m jwst_modified_inertia [options]
+
+Runs the selected analysis sections (default: all) and writes them as
+the printed report (text), or as the underlying tables (json, csv).
+
+Examples:
+    python -m jwst_modified_inertia --figure fig_jwst_analysis.png
+    python -m jwst_modified_inertia -s 2,6 --geom 5 --format json -o out.json
+    python -m jwst_modified_inertia --catalogue candidates.csv --name-column id -s 6
+    python -m jwst_modified_inertia --no-cache --profile trace.json
+    python -m jwst_modified_inertia --interp rar -s 6
+    python -m jwst_modified_inertia --compare-interp simple,standard,n:3,exponential,rar
+
+Results are reused from the on-disk cache (result_cache.py) unless
+--no-cache is given.
+"""
+
+import argparse
+import contextlib
+import csv
+import dataclasses
+import json
+import sys
+
+from . import instrument
+from .core import get_cosmology
+from .analysis import (
+    SECTIONS, SECTION_TABLES, analysis_data, run_analysis,
+    interpolation_comparison, print_interpolation_comparison,
+)
+from .interpolation import get_interpolation
+from .result_cache import ResultCache
+
+# Command-line options that override Cosmology fields
+COSMOLOGY_OPTIONS = {'H0': 'H0_km', 'Om': 'Om', 'Or': 'Or', 'OL': 'OL',
+                     'Ob': 'Ob', 'geom': 'GEOM'}
+
+
+def _sections(text):
+    try:
+        sections = sorted({int(s) for s in text.split(',')})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid section list '{text}'")
+    bad = [s for s in sections if s not in SECTIONS]
+    if bad:
+        raise argparse.ArgumentTypeError(f"unknown section(s) {bad}; "
+                                         f"choose from {list(SECTIONS)}")
+    return sections
+
+
+def _interp(text):
+    try:
+        get_interpolation(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return text
+
+
+def _interps(text):
+    return text if text == 'all' else [_interp(t) for t in text.split(',')]
+
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        prog='python -m jwst_modified_inertia',
+        description="Modified-inertia analysis of early massive JWST galaxies.")
+    p.add_argument('-s', '--sections', type=_sections, default=list(SECTIONS),
+                   help="comma-separated section numbers 1-6 (default: all)")
+    p.add_argument('-f', '--format', choices=('text', 'json', 'csv'),
+                   default='text', help="output format (default: text)")
+    p.add_argument('-o', '--output', help="output file (default: stdout)")
+    p.add_argument('--catalogue', help="galaxy catalogue (.csv, .npy or .parquet) "
+                   "instead of the built-in JWST sample")
+    p.add_argument('--name-column', help="CSV column with galaxy names")
+    p.add_argument('--figure', metavar='PATH', help="also render the figure to PATH")
+    p.add_argument('--compare-interp', type=_interps, metavar='NAMES',
+                   help="instead of the sections, compare the section 6 results "
+                   "under comma-separated interpolating functions ('all': every "
+                   "one without a parameter)")
+    p.add_argument('--profile', metavar='PATH',
+                   help="write a JSON trace of kernel calls and timings to PATH")
+    p.add_argument('--no-cache', action='store_true',
+                   help="do not read or write the on-disk result cache")
+    p.add_argument('--clear-cache', action='store_true',
+                   help="empty the result cache and exit")
+    p.add_argument('--cache-info', action='store_true',
+                   help="show the result cache location and size and exit")
+    cosmo = p.add_argument_group('cosmology (default: Planck 2018, GEOM = 6)')
+    for opt, field in COSMOLOGY_OPTIONS.items():
+        cosmo.add_argument(f'--{opt}', type=float, dest=field, metavar='X')
+    cosmo.add_argument('--interp', type=_interp, metavar='NAME',
+                       help="interpolating function: simple (the sharing function), "
+                       "standard, n:<n>, exponential or rar")
+    return p
+
+
+def _write_json(fh, tables, sections, cosmo):
+    json.dump({'cosmology': dataclasses.asdict(cosmo),
+               'sections': sections,
+               'tables': {name: {k: v.tolist() for k, v in cols.items()}
+                          for name, cols in tables.items()}},
+              fh, indent=1)
+    fh.write('\n')
+
+
+def _write_csv(fh, tables):
+    writer = csv.writer(fh, lineterminator='\n')
+    for i, (name, cols) in enumerate(tables.items()):
+        if i:
+            fh.write('\n')
+        fh.write(f"# {name}\n")
+        writer.writerow(cols)
+        writer.writerows(zip(*(v.tolist() for v in cols.values())))
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.clear_cache or args.cache_info:
+        cache = ResultCache()
+        info = cache.info()
+        if args.clear_cache:
+            cache.clear()
+            print(f"Removed {info['entries']} entries from {info['directory']}")
+        else:
+            print(f"{info['directory']}: {info['entries']} entries, "
+                  f"{info['bytes'] / 2**20:.1f} of {info['max_bytes'] / 2**20:.0f} MiB")
+        return 0
+
+    overrides = {f: getattr(args, f) for f in COSMOLOGY_OPTIONS.values()
+                 if getattr(args, f) is not None}
+    if args.interp:
+        overrides['interp'] = args.interp
+    cosmo = get_cosmology().replace(**overrides)
+
+    galaxies = None
+    if args.catalogue:
+        from .catalogue import load_galaxies
+        galaxies = load_galaxies(args.catalogue, name_column=args.name_column)
+
+    cache = None if args.no_cache else ResultCache()
+
+    with contextlib.ExitStack() as stack:
+        if args.profile:
+            trace = stack.enter_context(instrument.profile())
+        fh = (stack.enter_context(open(args.output, 'w')) if args.output
+              else sys.stdout)
+        if args.compare_interp:
+            interps = None if args.compare_interp == 'all' else args.compare_interp
+            tables = interpolation_comparison(interps, galaxies, cosmo, cache=cache)
+            if args.format == 'text':
+                with contextlib.redirect_stdout(fh):
+                    print_interpolation_comparison(tables)
+            elif args.format == 'json':
+                _write_json(fh, tables, [6], cosmo)
+            else:
+                _write_csv(fh, tables)
+        elif args.format == 'text':
+            with contextlib.redirect_stdout(fh):
+                run_analysis(galaxies, cosmo, args.sections, cache)
+        else:
+            data = analysis_data(galaxies, cosmo, sections=args.sections,
+                                 cache=cache)
+            names = [t for s in args.sections for t in SECTION_TABLES[s]]
+            tables = {t: data[t] for t in dict.fromkeys(names)}
+            if args.format == 'json':
+                _write_json(fh, tables, args.sections, cosmo)
+            else:
+                _write_csv(fh, tables)
+
+        if args.figure:
+            from .plotting import figure_data, render_figures
+            render_figures(figure_data(galaxies, cosmo, cache), args.figure)
+            print(f"Figure saved: {args.figure}", file=sys.stderr)
+
+    if args.profile:
+        trace.write_json(args.profile)
+        print(f"Trace saved: {args.profile}", file=sys.stderr)
+    return 0
@@ -0,0 +1,469 @@
+"""
+JWST Massive Early Galaxies: Modified Inertia Analysis (v2)
+============================================================
+
+Core calculation for Paper 3.
+
+Physics: Jacobson thermodynamic spacetime + two-horizon entanglement sharing
+         -> modified inertia with a_0(z) = c H(z) / 6
+         -> f(a) = a / (a + a_0): sharing function from Paper 4
+         -> accelerated gravitational collapse at high z
+
+The geometric factor 1/6 comes from the backward-hemisphere cos^2(theta)
+integral over mode overlap between planar Rindler and spherical Hubble
+entanglement (Paper 4, Eq. 13).
+
+Compares modified collapse timescales against JWST observations.
+
+This module holds the physics: constants, the Cosmology object, the
+cosmological and modified-inertia functions and the JWST sample. The
+printed analysis is in analysis.py, the figure in plotting.py and the
+command line in cli.py (python -m jwst_modified_inertia). Importing it
+performs no computation; tables are built on first use.
+"""
+
+import dataclasses
+from functools import lru_cache
+
+import numpy as np
+from .cosmic_time import cosmic_time_table
+from .growth import growth_table
+from .instrument import kernel
+from .interpolation import get_interpolation
+
+# =============================================================
+# CONSTANTS
+# =============================================================
+c = 2.998e8          # m/s
+G = 6.674e-11        # m^3 kg^-1 s^-2
+H0_km = 67.4         # km/s/Mpc
+Mpc = 3.0857e22      # m
+H0 = H0_km * 1e3 / Mpc  # 1/s
+kpc = 3.0857e19      # m
+Msun = 1.989e30      # kg
+Gyr = 3.1557e16      # s
+Myr = 3.1557e13      # s
+
+# Cosmological parameters (Planck 2018)
+Om = 0.315           # matter density
+Or = 9.1e-5          # radiation density
+OL = 0.685           # dark energy density
+Ob = 0.0493          # baryon density
+fb = Ob / Om         # baryon fraction = 0.156
+
+# Geometric factor from backward-hemisphere cos^2(theta) integral
+# = (1/2) * (1/3) = 1/6  [Paper 4, Sec. III.C]
+GEOM = 6.0
+
+# Interpolating function mu(a/a_0) = m_i/m_g (see interpolation.py);
+# 'simple' is the sharing function a / (a + a_0)
+INTERP = 'simple'
+
+# Present-day critical acceleration
+a0_now = c * H0 / GEOM   # = 1.09e-10 m/s^2
+
+# =============================================================
+# COSMOLOGY OBJECT
+# =============================================================
+
+@dataclasses.dataclass(frozen=True)
+class Cosmology:
+    """
+    Immutable set of cosmological and model parameters.
+
+    Every function below takes an optional cosmo argument; without it the
+    module-level parameters (H0, Om, Or, OL, fb, GEOM, INTERP) of this
+    module (jwst_modified_inertia.core) are used, read at call time.
+    Instances are hashable and picklable, so they can key caches and be
+    sent to worker processes for parameter scans.
+
+    The cosmic-time and growth tables are built on first use and shared
+    between equal instances through LRU caches (cosmic_time_table,
+    growth_table), so long scans stay within bounded memory.
+    """
+    H0_km: float = 67.4     # km/s/Mpc
+    Om: float = 0.315       # matter density
+    Or: float = 9.1e-5      # radiation density
+    OL: float = 0.685       # dark energy density
+    Ob: float = 0.0493      # baryon density
+    GEOM: float = 6.0       # geometric factor in a_0 = cH/GEOM
+    interp: str = 'simple'  # interpolating function (interpolation.py)
+
+    def __post_init__(self):
+        get_interpolation(self.interp)   # ValueError for an unknown name
+
+    @property
+    def H0(self):
+        """Hubble constant in 1/s."""
+        return self.H0_km * 1e3 / Mpc
+
+    @property
+    def fb(self):
+        """Baryon fraction Ob / Om."""
+        return self.Ob / self.Om
+
+    @property
+    def rho_crit_0(self):
+        """Present-day critical density in kg/m^3."""
+        return 3 * self.H0**2 / (8 * np.pi * G)
+
+    @property
+    def a0_now(self):
+        """Present-day critical acceleration c H0 / GEOM in m/s^2."""
+        return c * self.H0 / self.GEOM
+
+    @property
+    def interpolation(self):
+        """Interpolation object for interp."""
+        return get_interpolation(self.interp)
+
+    @property
+    def cosmic_time(self):
+        """CosmicTimeTable for this cosmology."""
+        return cosmic_time_table(self.H0, self.Om, self.Or, self.OL)
+
+    @property
+    def growth(self):
+        """GrowthTable for this cosmology."""
+        return growth_table(self.Om, self.Or, self.OL)
+
+    def replace(self, **changes):
+        """Copy with some parameters changed."""
+        return dataclasses.replace(self, **changes)
+
+
+@lru_cache(maxsize=8)
+def _module_cosmology(H0, Om, Or, OL, fb, GEOM, INTERP):
+    # Rounded so that the untouched module parameters give PLANCK18 exactly
+    return Cosmology(H0_km=round(H0 * Mpc / 1e3, 12), Om=Om, Or=Or, OL=OL,
+                     Ob=round(fb * Om, 12), GEOM=GEOM, interp=INTERP)
+
+
+def get_cosmology(cosmo=None):
+    """cosmo itself, or a Cosmology built from the current module parameters."""
+    if cosmo is not None:
+        return cosmo
+    return _module_cosmology(H0, Om, Or, OL, fb, GEOM, INTERP)
+
+
+PLANCK18 = Cosmology()
+
+
+# =============================================================
+# COSMOLOGICAL FUNCTIONS
+# =============================================================
+
+@kernel()
+def E(z, cosmo=None):
+    """Dimensionless Hubble parameter H(z)/H0."""
+    cosmo = get_cosmology(cosmo)
+    return np.sqrt(cosmo.Om * (1+z)**3 + cosmo.Or * (1+z)**4 + cosmo.OL)
+
+@kernel()
+def H(z, cosmo=None):
+    """Hubble parameter in 1/s."""
+    cosmo = get_cosmology(cosmo)
+    return cosmo.H0 * E(z, cosmo)
+
+@kernel()
+def a0(z, cosmo=None):
+    """Critical acceleration a_0(z) = c H(z) / GEOM (GEOM = 6) in m/s^2."""
+    cosmo = get_cosmology(cosmo)
+    return c * H(z, cosmo) / cosmo.GEOM
+
+@kernel()
+def age_at_z(z, cosmo=None):
+    """
+    Age of universe at redshift z, in seconds.
+
+    Looked up in the tabulated cosmic-time integral for the cosmology
+    (see cosmic_time.py); accepts scalars or arrays.
+    """
+    return get_cosmology(cosmo).cosmic_time.age(z)
+
+@kernel()
+def lookback_time(z, cosmo=None):
+    """Lookback time to redshift z, in seconds."""
+    return get_cosmology(cosmo).cosmic_time.lookback_time(z)
+
+@kernel()
+def redshift_at_age(t, cosmo=None):
+    """Redshift at which the universe has age t (seconds)."""
+    return get_cosmology(cosmo).cosmic_time.redshift(t)
+
+@kernel()
+def time_between(z1, z2, cosmo=None):
+    """Cosmic time elapsed between z2 and z1 (z1 < z2), in seconds."""
+    return get_cosmology(cosmo).cosmic_time.time_between(z1, z2)
+
+@kernel()
+def growth_factor(z, cosmo=None):
+    """
+    Unnormalized linear growth factor D(z), with D -> a in the matter era.
+
+    Looked up in the growth ODE solution for the cosmology
+    (see growth.py); accepts scalars or arrays.
+    """
+    return get_cosmology(cosmo).growth.growth_unnormalized(z)
+
+@kernel()
+def D_norm(z, cosmo=None):
+    """Growth factor normalized to D(0) = 1."""
+    return get_cosmology(cosmo).growth.growth(z)
+
+@kernel()
+def growth_rate(z, cosmo=None):
+    """Linear growth rate f = dlnD/dlna."""
+    return get_cosmology(cosmo).growth.growth_rate(z)
+
+@kernel()
+def peak_height(z, sigma0=2.0, delta_c=1.686, cosmo=None):
+    """Peak height nu for halo collapse."""
+    return delta_c / (sigma0 * D_norm(z, cosmo))
+
+
+# =============================================================
+# JWST GALAXY DATA
+# =============================================================
+# Format: (name, z_spec, log10_Mstar, log10_Mstar_err, reference, notes)
+# Stellar masses after best current revisions (AGN corrections etc.)
+
+jwst_galaxies = [
+    # Spectroscopically confirmed, most robust
+    ("JADES-GS-z14-0",   14.2,  8.7, 0.4, "Carniani+24", "Most distant confirmed"),
+    ("JADES-GS-z13-0",   13.2,  8.1, 0.3, "Curtis-Lake+23", "Spectroscopic"),
+    ("JADES-GS-z12-0",   12.6,  7.8, 0.3, "Curtis-Lake+23", "Spectroscopic"),
+    ("Maisie's Galaxy",   11.4,  8.5, 0.4, "Arrabal Haro+23", "Revised from z_phot~14"),
+    ("GN-z11",            10.6,  9.0, 0.3, "Bunker+23", "AGN signatures"),
+    # Labbe et al. candidates (revised masses after AGN/SFH corrections)
+    ("CEERS-1",            8.9,  9.5, 0.5, "Labbe+23/Barro+24", "Mass revised down"),
+    ("CEERS-2",            7.9,  9.8, 0.5, "Labbe+23/Barro+24", "Mass revised down"),
+    ("CEERS-3",            7.5, 10.0, 0.5, "Labbe+23/Barro+24", "Most massive candidate"),
+]
+
+
+# =============================================================
+# MODIFIED INERTIA PHYSICS (v2: entanglement sharing)
+# =============================================================
+
+def sharing_function(a, a0z, cosmo=None):
+    """
+    Entanglement sharing function f(a) = a / (a + a_0).
+
+    From two-horizon entropy sharing (Paper 4):
+    f = T_R / (T_R + T_H,eff)  with  T_H,eff = T_H / 6.
+
+    This gives the fraction of vacuum entanglement available to
+    the Rindler horizon, determining the effective inertial mass:
+    m_i = f(a) * m_g.
+
+    With another interpolating function in cosmo.interp (see
+    interpolation.py), f(a) = mu(a / a_0) of that function instead.
+    """
+    cosmo = get_cosmology(cosmo)
+    if cosmo.interp != 'simple':
+        return cosmo.interpolation.mu(a / a0z)
+    return a / (a + a0z)
+
+
+@kernel()
+def modified_acceleration(g_newt, z, a0z=None, cosmo=None):
+    """
+    Self-consistent acceleration under modified inertia (v2).
+
+    From f(a) = a/(a + a_0), the equation of motion
+        m_g * g = m_i(a) * a = m_g * f(a) * a
+    gives:
+        g = a^2 / (a + a_0)
+        => a^2 - g*a - g*a_0 = 0
+    Solution: a = (g + sqrt(g^2 + 4*g*a_0)) / 2
+
+    Limits:
+        g >> a_0:  a -> g  (Newtonian)
+        g << a_0:  a -> sqrt(g * a_0)  (deep-MOND)
+
+    For another interpolating function in cosmo.interp, g = mu(a/a_0) a
+    is solved by its Interpolation (closed form or batched Newton; see
+    interpolation.py).
+
+    Parameters:
+        g_newt: Newtonian gravitational acceleration (m/s^2)
+        z: redshift (determines a0)
+        a0z: precomputed a0(z), if already known
+        cosmo: Cosmology (default: module parameters)
+    Returns:
+        a_mod: modified acceleration (m/s^2)
+        eta: enhancement factor a_mod / g_newt
+    """
+    cosmo = get_cosmology(cosmo)
+    if a0z is None:
+        a0z = a0(z, cosmo)
+    if cosmo.interp != 'simple':
+        return cosmo.interpolation.acceleration(g_newt, a0z)
+    a_mod = (g_newt + np.sqrt(g_newt**2 + 4 * g_newt * a0z)) / 2
+    eta = a_mod / g_newt
+    return a_mod, eta
+
+
+COLLAPSE_FIELDS = (
+    'M_baryonic', 'z', 'rho_cloud', 'R_kpc', 'g_edge', 'a0_z', 'a_mod',
+    'g_over_a0', 'eta', 't_ff_std_Myr', 't_ff_mod_eta_Myr',
+    't_ff_mod_const_Myr', 't_ff_mod_geom_Myr',
+)
+
+
+@kernel()
+def collapse_timescale_batch(M_baryonic, z, overdensity=5.0, fields=None,
+                             cosmo=None):
+    """
+    Collapse timescales for arrays of protogalactic clouds.
+
+    Vectorized form of collapse_timescale: M_baryonic, z and overdensity
+    are broadcast against each other (e.g. M[:, None, None],
+    z[None, :, None], delta[None, None, :] for a full scan), and every
+    field is returned as an array of the broadcast shape.
+
+    Parameters:
+        M_baryonic: baryonic mass in kg
+        z: redshift
+        overdensity: factor above mean density at turnaround
+        fields: names from COLLAPSE_FIELDS to return (default: all)
+        cosmo: Cosmology (default: module parameters)
+    Returns:
+        dict of arrays, keyed as collapse_timescale
+    """
+    M_baryonic, z, overdensity = np.broadcast_arrays(
+        np.asarray(M_baryonic, dtype=float),
+        np.asarray(z, dtype=float),
+        np.asarray(overdensity, dtype=float))
+    cosmo = get_cosmology(cosmo)
+
+    # Mean matter density at z
+    rho_mean = cosmo.rho_crit_0 * cosmo.Om * (1 + z)**3
+
+    # Cloud density at turnaround
+    rho_cloud = overdensity * rho_mean
+
+    # Cloud radius (uniform sphere)
+    R = (3 * M_baryonic / (4 * np.pi * rho_cloud))**(1.0/3.0)
+
+    # Gravitational acceleration at cloud edge
+    g_edge = G * M_baryonic / R**2
+
+    # Standard free-fall time
+    t_ff_std = np.sqrt(3 * np.pi / (32 * G * rho_cloud))
+
+    # Modified acceleration and enhancement (a0(z) evaluated once)
+    a0z = a0(z, cosmo)
+    a_mod, eta = modified_acceleration(g_edge, z, a0z=a0z, cosmo=cosmo)
+
+    # Modified collapse: two estimates that bracket the true value
+    # 1) sqrt(eta) scaling of free-fall time
+    #    (free-fall time ~ 1/sqrt(a_eff), so t_mod ~ t_std / sqrt(eta))
+    t_ff_mod_eta = t_ff_std / np.sqrt(eta)
+
+    # 2) Constant-acceleration approximation
+    #    In the deep-MOND limit, a ~ sqrt(g * a_0), which is approximately
+    #    constant during early collapse. Use a_mod at the cloud edge.
+    t_ff_mod_const = np.sqrt(2 * R / a_mod)
+
+    # Geometric mean of the two estimates
+    t_ff_mod_geom = np.sqrt(t_ff_mod_eta * t_ff_mod_const)
+
+    record = {
+        'M_baryonic': M_baryonic,
+        'z': z,
+        'rho_cloud': rho_cloud,
+        'R_kpc': R / kpc,
+        'g_edge': g_edge,
+        'a0_z': a0z,
+        'a_mod': a_mod,
+        'g_over_a0': g_edge / a0z,
+        'eta': eta,
+        't_ff_std_Myr': t_ff_std / Myr,
+        't_ff_mod_eta_Myr': t_ff_mod_eta / Myr,
+        't_ff_mod_const_Myr': t_ff_mod_const / Myr,
+        't_ff_mod_geom_Myr': t_ff_mod_geom / Myr,
+    }
+    if fields is not None:
+        record = {k: record[k] for k in fields}
+    return record
+
+
+def collapse_record_to_structured(record):
+    """Pack a collapse_timescale_batch result into a NumPy structured array."""
+    first = next(iter(record.values()))
+    out = np.empty(first.shape, dtype=[(k, np.float64) for k in record])
+    for k, v in record.items():
+        out[k] = v
+    return out
+
+
+def collapse_timescale(M_baryonic, z, overdensity=5.0, cosmo=None):
+    """
+    Compute collapse timescale for a protogalactic cloud.
+
+    Standard free-fall from turnaround radius, then modified version.
+    For many clouds at once use collapse_timescale_batch.
+
+    Parameters:
+        M_baryonic: baryonic mass in kg
+        z: redshift
+        overdensity: factor above mean density at turnaround
+        cosmo: Cosmology (default: module parameters)
+    Returns:
+        dict with standard and modified timescales
+    """
+    record = collapse_timescale_batch(M_baryonic, z, overdensity, cosmo=cosmo)
+    return {k: v[()] for k, v in record.items()}
+
+
+# Verdicts of the summary table, by number of collapse times available
+VERDICTS = ('EASY', 'FEASIBLE', 'TIGHT')
+
+
+def verdict_index(n_collapses):
+    """
+    Index into VERDICTS for an array of collapse-time counts.
+
+    EASY = multiple (>= 3) collapses possible, FEASIBLE = at least one,
+    TIGHT = marginal.
+    """
+    return np.where(n_collapses >= 3, 0, np.where(n_collapses >= 1, 1, 2))
+
+
+@kernel()
+def max_stellar_mass_standard(z, sfe=0.1, nu=4.0, volume=None,
+                              model='sheth-tormen', cosmo=None):
+    """
+    Maximum stellar mass at redshift z in standard LCDM.
+
+    Uses the halo mass function engine (halo_mass_function.py): sigma(M)
+    from the Eisenstein-Hu power spectrum normalised to sigma_8 = 0.811.
+    By default the maximum halo is the one at peak height nu(M, z) = nu
+    (nu ~ 4-5: a few expected in the Hubble volume); with a survey volume
+    it is instead the most massive halo expected once in that volume.
+    Accepts arrays of z.
+
+    Parameters:
+        z: redshift
+        sfe: star formation efficiency
+        nu: peak height of the maximum halo (ignored if volume is given)
+        volume: comoving survey volume in Mpc^3
+        model: mass function used with volume ('sheth-tormen' or
+               'press-schechter')
+        cosmo: Cosmology (default: module parameters)
+    Returns:
+        M_star, M_halo in kg
+    """
+    from .halo_mass_function import halo_mass_function
+
+    cosmo = get_cosmology(cosmo)
+    hmf = halo_mass_function(cosmo)
+    if volume is None:
+        M_halo = hmf.mass_at_peak_height(nu, z) * Msun
+    else:
+        M_halo = hmf.largest_halo(z, volume, model) * Msun
+    M_star = sfe * cosmo.fb * M_halo
+
+    return M_star, M_halo
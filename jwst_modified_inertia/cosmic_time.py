@@ -0,0 +1,143 @@
+"""
+Tabulated cosmic time t(z)
+==========================
+
+The age integral
+
+    t(z) = (1/H0) * int_z^inf dz' / ((1+z') E(z'))
+         = (1/H0) * int_{-inf}^{ln a} dx / E(x),      x = ln a = -ln(1+z)
+
+is evaluated once per cosmology on a dense grid in x, after which every
+query is a piecewise-polynomial lookup. The integrand is represented by a
+cubic spline in x and integrated exactly (spline antiderivative), so the
+tabulated t(x) is smooth and its error scales as h^4.
+
+Above z_max the Lambda term is negligible and the matter + radiation tail
+is integrated in closed form:
+
+    H0 t(a) = int_0^a a' da' / sqrt(Om a' + Or)
+            = 2 a^2 (s + 2r) / (3 (s + r)^2),   s = sqrt(Om a + Or), r = sqrt(Or)
+
+(written in a form free of cancellation for both Or -> 0 and Om -> 0).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .instrument import kernel
+
+
+def _tail(a, Om, Or):
+    """H0 * t(a) for a matter + radiation universe (Lambda neglected)."""
+    s = np.sqrt(Om * a + Or)
+    r = np.sqrt(Or)
+    return 2.0 * a**2 * (s + 2.0 * r) / (3.0 * (s + r)**2)
+
+
+class CosmicTimeTable:
+    """
+    Cumulative age integral for one (H0, Om, Or, OL) cosmology.
+
+    All query methods accept scalars or NumPy arrays of redshift, return
+    times in seconds, and do no integration at query time.
+
+    Parameters:
+        H0: Hubble constant in 1/s
+        Om, Or, OL: matter, radiation and dark-energy density parameters
+        z_max: upper edge of the tabulated range; beyond it the closed-form
+               matter + radiation tail is used
+        n_grid: number of nodes on the ln(1+z) grid
+    """
+
+    @kernel('CosmicTimeTable.build')
+    def __init__(self, H0, Om, Or, OL, z_max=1e8, n_grid=4096):
+        # SciPy is imported on first use to keep package import cheap
+        from scipy.interpolate import CubicSpline
+
+        self.H0 = H0
+        self.Om = Om
+        self.Or = Or
+        self.OL = OL
+        self.z_max = z_max
+
+        # x = ln a, from the tail boundary up to today
+        x = np.linspace(-np.log1p(z_max), 0.0, n_grid)
+        inv_E = 1.0 / np.sqrt(Om * np.exp(-3 * x) + Or * np.exp(-4 * x) + OL)
+
+        # H0 * t(x): exact integral of the integrand spline plus the tail
+        self._t_of_x = CubicSpline(x, inv_E).antiderivative()
+        self._t_of_x.c[-1] += _tail(np.exp(x[0]), Om, Or)
+        self._x_min = x[0]
+
+        # Inverse table: x as a function of ln(H0 t) on the same nodes
+        lnt = np.log(self._t_of_x(x))
+        self._x_of_lnt = CubicSpline(lnt, x)
+        self._lnt_min = lnt[0]
+
+        self.t0 = self.age(0.0)
+
+    def _H0t(self, z):
+        x = -np.log1p(np.asarray(z, dtype=float))
+        return np.where(x >= self._x_min,
+                        self._t_of_x(np.maximum(x, self._x_min)),
+                        _tail(np.exp(x), self.Om, self.Or))
+
+    def age(self, z):
+        """Age of the universe at redshift z, in seconds."""
+        return self._H0t(z)[()] / self.H0
+
+    def lookback_time(self, z):
+        """Lookback time to redshift z, t(0) - t(z), in seconds."""
+        return self.t0 - self.age(z)
+
+    def time_between(self, z1, z2):
+        """Cosmic time elapsed between z2 and z1, t(z1) - t(z2), in seconds."""
+        return (self._H0t(z1) - self._H0t(z2))[()] / self.H0
+
+    @kernel()
+    def redshift(self, t):
+        """
+        Redshift at which the universe has age t (seconds); inverse of age.
+
+        Below the tabulated range the radiation-era relation
+        a = sqrt(2 sqrt(Or) H0 t) is used.
+        """
+        lnt = np.log(np.asarray(t, dtype=float) * self.H0)
+        x = np.where(lnt >= self._lnt_min,
+                     self._x_of_lnt(np.maximum(lnt, self._lnt_min)),
+                     0.5 * (lnt + np.log(2 * np.sqrt(self.Or))))
+        return np.expm1(-x)[()]
+
+    @kernel()
+    def age_quad(self, z):
+        """Reference age at a single redshift by direct quadrature (slow)."""
+        from scipy import integrate
+
+        # Same integral in the scale factor, over a finite interval
+        def integrand(a):
+            return a / np.sqrt(self.Om * a + self.Or + self.OL * a**4)
+        result, _ = integrate.quad(integrand, 0.0, 1.0 / (1.0 + z),
+                                   epsabs=0.0, epsrel=1e-12, limit=200)
+        return result / self.H0
+
+    def accuracy(self, z=None):
+        """
+        Maximum relative error of the table against quad.
+
+        Parameters:
+            z: redshifts to check (default: 0-1000, log-spaced in 1+z)
+        Returns:
+            max |t_table / t_quad - 1| over the sample
+        """
+        if z is None:
+            z = np.expm1(np.linspace(0.0, np.log(1001.0), 60))
+        z = np.atleast_1d(z)
+        exact = np.array([self.age_quad(zi) for zi in z])
+        return float(np.max(np.abs(self.age(z) / exact - 1)))
+
+
+@lru_cache(maxsize=128)
+def cosmic_time_table(H0, Om, Or, OL):
+    """Shared CosmicTimeTable for a cosmology, built on first use."""
+    return CosmicTimeTable(H0, Om, Or, OL)
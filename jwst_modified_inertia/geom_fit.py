@@ -0,0 +1,251 @@
+"""
+Posterior fit of the geometric factor GEOM
+==========================================
+
+The model fixes GEOM = 6 (a_0 = c H / 6) with no free parameters. Here
+GEOM, and optionally log10 SFE and log10 overdensity, are sampled
+against the "formed in time" constraint of section 6: every galaxy of
+the sample must have had at least k modified collapse times between
+z_start and its redshift.
+
+The constraint is made soft and marginalised over the stellar-mass
+uncertainty. For galaxy i,
+
+    P_i = sum_j w_j Phi( ln(N_ij / k) / softness ),
+    N_ij = t_avail(z_i) / t_ff,mod(M*_ij / SFE, z_i, overdensity; GEOM),
+
+with M*_ij at the Gauss-Hermite nodes of log10 M* ~ Normal(log10_Mstar,
+log10_Mstar_err), and the log likelihood is sum_i ln P_i. Priors are
+uniform on bounded ranges.
+
+FormationLikelihood evaluates a whole walker ensemble in one call: the
+clouds (galaxies x mass nodes) are fixed, so the collapse times come
+from a CollapseEvaluator (fast_collapse.py) with one parameter row per
+walker. sample() runs the affine-invariant ensemble sampler of Goodman
+& Weare (2010, stretch move), updating each half of the ensemble with
+one likelihood call, and can run independent chains in worker
+processes. Chain k always uses the k-th child of SeedSequence(seed).
+
+    python -m jwst_modified_inertia.geom_fit
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import Msun, jwst_galaxies, get_cosmology
+from .fast_collapse import CollapseEvaluator
+from .analysis import print_header
+from .instrument import kernel
+from .thresholds import available_time
+
+PARAMETERS = ('geom', 'log10_sfe', 'log10_overdensity')
+
+DEFAULT_PRIORS = {
+    'geom': (1.0, 30.0),
+    'log10_sfe': (-2.0, 0.0),
+    'log10_overdensity': (0.0, 2.0),
+}
+
+
+class FormationLikelihood:
+    """
+    Log posterior of (GEOM[, log10 SFE, log10 overdensity]) for a sample.
+
+    Parameters:
+        galaxies: list in jwst_galaxies format (default: jwst_galaxies)
+        params: sampled names from PARAMETERS, in the order of theta
+        priors: {name: (low, high)} overriding DEFAULT_PRIORS
+        sfe, overdensity: values used when they are not sampled
+        k: required number of collapse times
+        softness: width of the constraint in ln N_collapses
+        n_nodes: Gauss-Hermite nodes over the mass uncertainty
+        z_start: redshift at which the time budget starts
+        cosmo: Cosmology for everything except GEOM (default: module
+               parameters)
+    """
+
+    def __init__(self, galaxies=None, params=('geom',), priors=None, sfe=0.1,
+                 overdensity=5.0, k=1.0, softness=0.1, n_nodes=5, z_start=30.0,
+                 cosmo=None):
+        if galaxies is None:
+            galaxies = jwst_galaxies
+        bad = [p for p in params if p not in PARAMETERS]
+        if bad or 'geom' not in params:
+            raise ValueError(f"params must include 'geom' and come from {PARAMETERS}")
+        self.params = tuple(params)
+        self.priors = {**DEFAULT_PRIORS, **(priors or {})}
+        self.bounds = np.array([self.priors[p] for p in self.params], dtype=float)
+        self.sfe = sfe
+        self.overdensity = overdensity
+        self.softness = softness
+        self.ln_k = np.log(k)
+        cosmo = get_cosmology(cosmo)
+
+        z = np.array([g[1] for g in galaxies], dtype=float)
+        logM = np.array([g[2] for g in galaxies], dtype=float)
+        logM_err = np.array([g[3] for g in galaxies], dtype=float)
+        # Probabilists' Gauss-Hermite nodes for a unit normal
+        nodes, weights = np.polynomial.hermite_e.hermegauss(n_nodes)
+        self._weights = weights / weights.sum()
+        M_star = 10**(logM[:, None] + logM_err[:, None] * nodes) * Msun
+        # Clouds at SFE = 1; the sampled SFE enters as mass_factor = 1 / SFE
+        self._evaluator = CollapseEvaluator(M_star, z[:, None], cosmo)
+        with np.errstate(divide='ignore'):
+            self._ln_t_avail = np.log(available_time(z, z_start, cosmo))[:, None]
+        self.n_galaxies = z.size
+
+    @property
+    def ndim(self):
+        return len(self.params)
+
+    def _columns(self, theta):
+        """GEOM, mass factor and overdensity as (W, 1, 1) columns."""
+        cols = dict(zip(self.params, np.moveaxis(theta, -1, 0)))
+        geom = cols['geom'][:, None, None]
+        sfe = (10**cols['log10_sfe'] if 'log10_sfe' in cols
+               else np.full(theta.shape[0], self.sfe))
+        delta = (10**cols['log10_overdensity'] if 'log10_overdensity' in cols
+                 else np.full(theta.shape[0], self.overdensity))
+        return geom, (1 / sfe)[:, None, None], delta[:, None, None]
+
+    @kernel('FormationLikelihood')
+    def __call__(self, theta):
+        """
+        Log posterior for parameter rows theta of shape (W, ndim) -> (W,);
+        -inf outside the priors.
+        """
+        from scipy.special import ndtr
+
+        theta = np.atleast_2d(np.asarray(theta, dtype=float))
+        inside = np.all((theta >= self.bounds[:, 0]) & (theta <= self.bounds[:, 1]),
+                        axis=1)
+        logp = np.full(theta.shape[0], -np.inf)
+        if not inside.any():
+            return logp
+        geom, mass_factor, delta = self._columns(theta[inside])
+        t_mod = self._evaluator(delta, geom, mass_factor,
+                                fields=('t_ff_mod_geom_Myr',))['t_ff_mod_geom_Myr']
+        ln_n = self._ln_t_avail - np.log(t_mod)
+        p = ndtr((ln_n - self.ln_k) / self.softness) @ self._weights
+        with np.errstate(divide='ignore'):
+            logp[inside] = np.log(p).sum(axis=1)
+        return logp
+
+
+def _run_chain(log_prob, seed_seq, n_walkers, n_steps, a):
+    """One ensemble of n_walkers for n_steps stretch moves per walker."""
+    rng = np.random.default_rng(seed_seq)
+    bounds = log_prob.bounds
+    ndim = bounds.shape[0]
+    # Start from the prior, keeping only points with finite probability
+    x = np.empty((0, ndim))
+    lp = np.empty(0)
+    for _ in range(100):
+        trial = rng.uniform(bounds[:, 0], bounds[:, 1], (n_walkers, ndim))
+        lp_trial = log_prob(trial)
+        keep = np.isfinite(lp_trial)
+        x = np.concatenate([x, trial[keep]])[:n_walkers]
+        lp = np.concatenate([lp, lp_trial[keep]])[:n_walkers]
+        if x.shape[0] == n_walkers:
+            break
+    else:
+        raise RuntimeError("no starting point with finite probability in the priors")
+
+    chain = np.empty((n_steps, n_walkers, ndim))
+    log_p = np.empty((n_steps, n_walkers))
+    accepted = 0
+    halves = (np.arange(0, n_walkers, 2), np.arange(1, n_walkers, 2))
+    for step in range(n_steps):
+        for move, other in (halves, halves[::-1]):
+            z = ((a - 1) * rng.random(move.size) + 1)**2 / a
+            partner = x[rng.choice(other, move.size)]
+            proposal = partner + z[:, None] * (x[move] - partner)
+            lp_new = log_prob(proposal)
+            log_ratio = (ndim - 1) * np.log(z) + lp_new - lp[move]
+            ok = np.log(rng.random(move.size)) < log_ratio
+            x[move[ok]] = proposal[ok]
+            lp[move[ok]] = lp_new[ok]
+            accepted += ok.sum()
+        chain[step] = x
+        log_p[step] = lp
+    return chain, log_p, accepted / (n_steps * n_walkers)
+
+
+def sample(log_prob, n_walkers=64, n_steps=2000, n_chains=1, processes=None,
+           a=2.0, seed=0):
+    """
+    Affine-invariant ensemble MCMC.
+
+    Parameters:
+        log_prob: FormationLikelihood (or any picklable callable mapping
+                  (W, ndim) rows to (W,) log probabilities, with .bounds
+                  (ndim, 2) prior ranges to start from)
+        n_walkers: walkers per chain (even, >= 2 ndim)
+        n_steps: steps per walker
+        n_chains: independent chains
+        processes: worker processes for the chains (None or 1: run here)
+        a: stretch-move scale
+        seed: root seed of the SeedSequence
+    Returns:
+        dict with 'chain' (n_chains, n_steps, n_walkers, ndim),
+        'log_prob' (n_chains, n_steps, n_walkers), 'acceptance' per
+        chain, 'params', 'evaluations' and 'seconds'
+    """
+    if n_walkers % 2 or n_walkers < 2 * log_prob.bounds.shape[0]:
+        raise ValueError("n_walkers must be even and at least twice the dimension")
+    seeds = np.random.SeedSequence(seed).spawn(n_chains)
+    args = [(log_prob, ss, n_walkers, n_steps, a) for ss in seeds]
+
+    t0 = time.perf_counter()
+    if processes is None or processes == 1:
+        parts = [_run_chain(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(_run_chain, *zip(*args)))
+    seconds = time.perf_counter() - t0
+
+    chain, log_p, acceptance = zip(*parts)
+    return {
+        'chain': np.stack(chain),
+        'log_prob': np.stack(log_p),
+        'acceptance': np.array(acceptance),
+        'params': getattr(log_prob, 'params', None),
+        'evaluations': n_chains * n_steps * n_walkers,
+        'seconds': seconds,
+    }
+
+
+def summarize(result, burn=None):
+    """
+    Posterior percentiles (16, 50, 84) of each parameter.
+
+    The first `burn` steps of every chain are dropped (default: a quarter).
+    """
+    chain = result['chain']
+    if burn is None:
+        burn = chain.shape[1] // 4
+    flat = chain[:, burn:].reshape(-1, chain.shape[-1])
+    names = result['params'] or [f'p{i}' for i in range(flat.shape[1])]
+    return {name: np.percentile(flat[:, i], [16, 50, 84])
+            for i, name in enumerate(names)}
+
+
+def print_fit_summary(result, burn=None):
+    """Print the percentiles, acceptance and throughput of a sample() run."""
+    print_header("POSTERIOR OF GEOM FROM THE FORMED-IN-TIME CONSTRAINT")
+    print(f"{'parameter':>20s}  {'16%':>8s}  {'50%':>8s}  {'84%':>8s}")
+    print("-" * 50)
+    for name, (lo, mid, hi) in summarize(result, burn).items():
+        print(f"{name:>20s}  {lo:8.3f}  {mid:8.3f}  {hi:8.3f}")
+    shape = result['chain'].shape
+    print(f"\n{shape[0]} chain(s) x {shape[2]} walkers x {shape[1]} steps; "
+          f"acceptance {result['acceptance'].mean():.2f}")
+    print(f"{result['evaluations']:,d} likelihood evaluations in "
+          f"{result['seconds']:.1f} s ({result['evaluations'] / result['seconds'] * 60:,.0f}/min)")
+
+
+if __name__ == '__main__':
+    print_fit_summary(sample(FormationLikelihood(
+        params=('geom', 'log10_sfe', 'log10_overdensity'))))
@@ -0,0 +1,307 @@
+"""
+Memory-mapped parameter grids of collapse timescales
+====================================================
+
+build_grid evaluates collapse_timescale_batch over the outer product of
+
+    log10_Mstar   stellar mass [Msun]; the cloud has M_baryonic = M* / SFE
+    z             redshift
+    overdensity   turnaround overdensity
+    sfe           star formation efficiency
+    geom          geometric factor GEOM in a_0 = c H / GEOM
+
+and stores each requested field as an .npy array of that 5-D shape in a
+grid directory:
+
+    meta.json     axes, fields, dtype, tile shape, z_start, cosmology,
+                  code version
+    <field>.npy   one array per field (float64 or float32)
+    done.npy      one flag per tile
+
+The arrays are written through memory maps one tile at a time, so the
+grid never has to fit in memory, and tiles can be filled by several
+worker processes (each writes its own region of the files). A tile is
+flagged done only after its data have been flushed: calling build_grid
+again with the same arguments and the same code version after an
+interruption skips the finished tiles and fills the rest.
+
+The collapse time from the bracketing estimate (t_ff_mod_geom) can be
+stored next to that of the dynamical infall integration (infall.py):
+the fields in INFALL_FIELDS integrate the cloud edge for every grid
+point, in blocks of INFALL_BLOCK clouds, at about 10^4 clouds per second
+and process. They are opt-in; the closed form stays the default.
+
+CollapseGrid opens a grid read-only; its arrays are memory maps, so
+slicing them (directly, or by axis values with select) reads only the
+slice from disk.
+"""
+
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import (
+    Msun, Myr, Cosmology, get_cosmology, time_between, COLLAPSE_FIELDS,
+    collapse_timescale_batch,
+)
+from .infall import infall_collapse
+from .instrument import kernel
+from .result_cache import code_version
+
+AXES = ('log10_Mstar', 'z', 'overdensity', 'sfe', 'geom')
+
+# Fields from the radial infall integration: edge collapse time, the
+# number of those available since z_start, and t_ff_mod_geom / t_infall - 1
+INFALL_FIELDS = ('t_infall_Myr', 'n_collapses_infall', 'bracket_error')
+
+# Fields that can be stored: the collapse record plus the number of
+# modified collapse times available since z_start
+GRID_FIELDS = COLLAPSE_FIELDS + ('n_collapses',) + INFALL_FIELDS
+
+DEFAULT_FIELDS = ('g_over_a0', 'eta', 't_ff_std_Myr', 't_ff_mod_geom_Myr',
+                  'n_collapses')
+
+# Shells per cloud and clouds per call of infall_collapse. A uniform
+# cloud has no shell crossing and its edge feels the total mass only, so
+# a few shells give the edge collapse time
+INFALL_SHELLS = 8
+INFALL_BLOCK = 2**14
+
+# Parameters that must match for build_grid to resume an existing grid;
+# tiles written by another version of the code are not mixed in
+_RESUME_KEYS = ('axes', 'fields', 'dtype', 'chunks', 'z_start', 'cosmology',
+                'code_version')
+
+
+def _default_chunks(shape, max_points=2**20):
+    """Tile shape: whole trailing axes, split the leading ones to max_points."""
+    chunks = [1] * len(shape)
+    size = 1
+    for i in range(len(shape) - 1, -1, -1):
+        n = min(shape[i], max(1, max_points // size))
+        chunks[i] = n
+        size *= n
+        if n < shape[i]:
+            break
+    return tuple(chunks)
+
+
+def _n_tiles(shape, chunks):
+    return tuple(-(-n // c) for n, c in zip(shape, chunks))
+
+
+def _tile_slices(tile, chunks):
+    return tuple(slice(t * c, (t + 1) * c) for t, c in zip(tile, chunks))
+
+
+def _read_meta(path):
+    with open(os.path.join(path, 'meta.json')) as fh:
+        return json.load(fh)
+
+
+def _write_meta(path, meta):
+    fd, tmp = tempfile.mkstemp(dir=path, suffix='.tmp')
+    with os.fdopen(fd, 'w') as fh:
+        json.dump(meta, fh, indent=1)
+        fh.write('\n')
+    os.replace(tmp, os.path.join(path, 'meta.json'))
+
+
+def _infall_time(M_baryonic, z, overdensity, cosmo):
+    """Edge collapse time in Myr from infall_collapse, in blocks of clouds."""
+    arrays = np.broadcast_arrays(M_baryonic, z, overdensity)
+    M, z, delta = (a.ravel() for a in arrays)
+    t = np.empty(M.size)
+    for start in range(0, M.size, INFALL_BLOCK):
+        block = slice(start, start + INFALL_BLOCK)
+        t[block] = infall_collapse(M[block], z[block], delta[block],
+                                   n_shells=INFALL_SHELLS,
+                                   cosmo=cosmo)['t_collapse_Myr']
+    return t.reshape(arrays[0].shape)
+
+
+@kernel()
+def _fill_tile(path, tile):
+    """Compute one tile and write it into the field arrays of the grid at path."""
+    meta = _read_meta(path)
+    sl = _tile_slices(tile, meta['chunks'])
+    axes = [np.asarray(meta['axes'][a], dtype=float)[s] for a, s in zip(AXES, sl)]
+    logM, z, delta, sfe, geom = np.ix_(*axes)
+    base = Cosmology(**meta['cosmology'])
+    fields = meta['fields']
+    collapse = [f for f in fields if f in COLLAPSE_FIELDS]
+    if 'n_collapses' in fields or 'bracket_error' in fields:
+        collapse = list(dict.fromkeys(collapse + ['t_ff_mod_geom_Myr']))
+    infall = any(f in INFALL_FIELDS for f in fields)
+
+    M_bary = 10**logM * Msun / sfe
+    z_start = meta['z_start']
+    t_avail = np.where(z < z_start,
+                       time_between(np.minimum(z, z_start), z_start, base) / Myr, 0.0)
+    out = {f: np.empty(tuple(a.size for a in axes)) for f in fields}
+    # GEOM enters through the cosmology; the time tables do not depend on it
+    for k, g in enumerate(geom.ravel()):
+        cosmo = base.replace(GEOM=float(g))
+        r = collapse_timescale_batch(M_bary[..., 0], z[..., 0], delta[..., 0],
+                                     fields=collapse, cosmo=cosmo)
+        if infall:
+            r['t_infall_Myr'] = _infall_time(M_bary[..., 0], z[..., 0],
+                                             delta[..., 0], cosmo)
+        for f in fields:
+            if f == 'n_collapses':
+                out[f][..., k] = t_avail[..., 0] / r['t_ff_mod_geom_Myr']
+            elif f == 'n_collapses_infall':
+                out[f][..., k] = t_avail[..., 0] / r['t_infall_Myr']
+            elif f == 'bracket_error':
+                out[f][..., k] = r['t_ff_mod_geom_Myr'] / r['t_infall_Myr'] - 1
+            else:
+                out[f][..., k] = r[f]
+
+    for f in fields:
+        arr = np.load(os.path.join(path, f'{f}.npy'), mmap_mode='r+')
+        arr[sl] = out[f]
+        arr.flush()
+        del arr
+    return tile
+
+
+def build_grid(path, log10_Mstar, z, overdensity=(5.0,), sfe=(0.1,), geom=(6.0,),
+               fields=DEFAULT_FIELDS, dtype='float64', chunks=None,
+               z_start=30.0, processes=None, overwrite=False, cosmo=None):
+    """
+    Fill (or resume filling) a grid directory.
+
+    Parameters:
+        path: grid directory (created if missing)
+        log10_Mstar, z, overdensity, sfe, geom: 1-D axis values
+        fields: names from GRID_FIELDS to store
+        dtype: 'float64' or 'float32' for the stored arrays
+        chunks: tile shape over the five axes (default: whole trailing
+                axes, about 10^6 points per tile)
+        z_start: redshift at which the time budget for n_collapses starts
+        processes: worker processes (None or 1: fill in this process)
+        overwrite: discard an existing grid with different parameters
+                   instead of raising ValueError
+        cosmo: Cosmology for everything except GEOM (default: module
+               parameters)
+    Returns:
+        CollapseGrid opened on path
+    """
+    axes = {a: [float(v) for v in np.atleast_1d(values)] for a, values in
+            zip(AXES, (log10_Mstar, z, overdensity, sfe, geom))}
+    shape = tuple(len(v) for v in axes.values())
+    fields = list(fields)
+    bad = [f for f in fields if f not in GRID_FIELDS]
+    if bad:
+        raise ValueError(f"unknown field(s) {bad}; choose from {GRID_FIELDS}")
+    if np.dtype(dtype) not in (np.float32, np.float64):
+        raise ValueError(f"dtype must be float32 or float64, not {dtype}")
+    chunks = list(chunks or _default_chunks(shape))
+    cosmo = get_cosmology(cosmo)
+    meta = {
+        'axes': axes,
+        'fields': fields,
+        'dtype': np.dtype(dtype).name,
+        'chunks': chunks,
+        'z_start': float(z_start),
+        'cosmology': {k: getattr(cosmo, k) for k in Cosmology.__dataclass_fields__},
+        'shape': list(shape),
+        'code_version': code_version(),
+    }
+
+    os.makedirs(path, exist_ok=True)
+    n_tiles = _n_tiles(shape, chunks)
+    resume = os.path.exists(os.path.join(path, 'meta.json'))
+    if resume:
+        old = _read_meta(path)
+        if any(old.get(k) != meta[k] for k in _RESUME_KEYS):
+            if not overwrite:
+                raise ValueError(f"{path} holds a grid with different parameters "
+                                 "(pass overwrite=True to replace it)")
+            resume = False
+    if not resume:
+        for name in os.listdir(path):
+            if name.endswith('.npy'):
+                os.remove(os.path.join(path, name))
+        for f in fields:
+            np.lib.format.open_memmap(os.path.join(path, f'{f}.npy'), mode='w+',
+                                      dtype=meta['dtype'], shape=shape)
+        np.save(os.path.join(path, 'done.npy'), np.zeros(n_tiles, dtype=bool))
+        _write_meta(path, meta)
+
+    done = np.load(os.path.join(path, 'done.npy'), mmap_mode='r+')
+    todo = [t for t in np.ndindex(*n_tiles) if not done[t]]
+    if processes is None or processes == 1:
+        finished = (_fill_tile(path, t) for t in todo)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=processes)
+        finished = pool.map(_fill_tile, [path] * len(todo), todo)
+    try:
+        for t in finished:
+            done[t] = True
+            done.flush()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        del done
+    return CollapseGrid(path)
+
+
+class CollapseGrid:
+    """
+    Read-only view of a grid directory written by build_grid.
+
+    grid[field] is a memory-mapped array over AXES; grid.axes maps each
+    axis name to its values.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = _read_meta(path)
+        self.axes = {a: np.array(v) for a, v in self.meta['axes'].items()}
+        self.fields = tuple(self.meta['fields'])
+        self.shape = tuple(self.meta['shape'])
+
+    def __getitem__(self, field):
+        if field not in self.fields:
+            raise KeyError(f"{field!r} not in grid (fields: {self.fields})")
+        return np.load(os.path.join(self.path, f'{field}.npy'), mmap_mode='r')
+
+    @property
+    def complete(self):
+        """True once every tile has been filled."""
+        return bool(np.load(os.path.join(self.path, 'done.npy')).all())
+
+    def index(self, axis, value):
+        """Index of the axis node nearest to value."""
+        return int(np.argmin(np.abs(self.axes[axis] - value)))
+
+    def select(self, field, **ranges):
+        """
+        Slice of a field by axis values, read from disk.
+
+        Each keyword names an axis and gives either a value (nearest
+        node; the axis is dropped) or a (low, high) range (inclusive; the
+        axis is kept). Unnamed axes are kept whole.
+
+            grid.select('n_collapses', sfe=0.1, geom=6, z=(8, 14))
+        """
+        bad = set(ranges) - set(AXES)
+        if bad:
+            raise KeyError(f"unknown axis {sorted(bad)}; axes are {AXES}")
+        index = []
+        for a in AXES:
+            if a not in ranges:
+                index.append(slice(None))
+            elif np.ndim(ranges[a]) == 0:
+                index.append(self.index(a, ranges[a]))
+            else:
+                lo, hi = ranges[a]
+                inside = np.flatnonzero((self.axes[a] >= lo) & (self.axes[a] <= hi))
+                index.append(slice(inside[0], inside[-1] + 1) if inside.size
+                             else slice(0, 0))
+        return np.asarray(self[field][tuple(index)])
@@ -0,0 +1,117 @@
+"""
+Linear growth factor D(z) from a single ODE solve
+=================================================
+
+The growing mode of the linear density contrast obeys, in x = ln a,
+
+    D'' + (2 + dlnE/dx) D' - (3/2) Omega_m(x) D = 0
+
+which is integrated once per cosmology from z_max down to z = 0, starting
+on the Meszaros growing mode of the matter + radiation era,
+
+    D = 1 + (3/2) y,   y = a / a_eq = a Om / Or,
+
+(Lambda is negligible there); without radiation (Or = 0) it starts on
+the matter-era mode D = a instead. The solution is resampled onto a uniform
+ln(1+z) grid and stored as cubic splines of ln D and f = dlnD/dlna, so
+every later query is an array lookup. Above z_max the Meszaros solution
+itself is returned.
+
+Unlike the Heath integral D ~ E(z) int (1+z)/E^3 dz, which is exact only
+for matter + Lambda, the ODE treats the radiation term consistently; the
+two differ by < 1% in D(z)/D(0) for z < 20.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .instrument import kernel
+
+
+class GrowthTable:
+    """
+    Linear growth factor and growth rate for one (Om, Or, OL) cosmology.
+
+    All query methods accept scalars or NumPy arrays of redshift.
+    The unnormalized growth factor is scaled so that D -> a deep in the
+    matter era; D0 is its value today.
+
+    Parameters:
+        Om, Or, OL: matter, radiation and dark-energy density parameters
+        z_max: redshift at which the ODE is started
+        n_grid: number of nodes on the ln(1+z) grid
+    """
+
+    @kernel('GrowthTable.build')
+    def __init__(self, Om, Or, OL, z_max=1e8, n_grid=4096):
+        from scipy.integrate import solve_ivp
+        from scipy.interpolate import CubicSpline
+
+        self.Om = Om
+        self.Or = Or
+        self.OL = OL
+        self.z_max = z_max
+        # a / a_eq = y_eq a; None without radiation
+        self._y_eq = Om / Or if Or > 0 else None
+
+        def rhs(x, y):
+            m = Om * np.exp(-3 * x)
+            r = Or * np.exp(-4 * x)
+            E2 = m + r + OL
+            dlnE = -(3 * m + 4 * r) / (2 * E2)
+            return [y[1], -(2 + dlnE) * y[1] + 1.5 * (m / E2) * y[0]]
+
+        x = np.linspace(-np.log1p(z_max), 0.0, n_grid)
+        if self._y_eq is None:
+            a_i = np.exp(x[0])
+            start = [a_i, a_i]
+            self._scale = 1.0
+        else:
+            y_i = self._y_eq * np.exp(x[0])
+            start = [1 + 1.5 * y_i, 1.5 * y_i]
+            # Rescale so that D -> a in the matter era (Meszaros: D -> 1.5 y)
+            self._scale = 1.0 / (1.5 * self._y_eq)
+        sol = solve_ivp(rhs, (x[0], x[-1]), start,
+                        method='DOP853', t_eval=x, rtol=1e-10, atol=1e-14)
+        D, dD = sol.y
+
+        self._lnD = CubicSpline(x, np.log(D * self._scale))
+        self._f = CubicSpline(x, dD / D)
+        self._x_min = x[0]
+
+        self.D0 = float(D[-1] * self._scale)
+
+    def _x(self, z):
+        return -np.log1p(np.asarray(z, dtype=float))
+
+    def _early(self, x):
+        """Growing mode above z_max: D (scaled) and f."""
+        if self._y_eq is None:
+            return np.exp(x), np.ones_like(x)
+        y = self._y_eq * np.exp(x)
+        return (1 + 1.5 * y) * self._scale, 1.5 * y / (1 + 1.5 * y)
+
+    def growth_unnormalized(self, z):
+        """Growth factor D(z), with D -> a in the matter era."""
+        x = self._x(z)
+        return np.where(x >= self._x_min,
+                        np.exp(self._lnD(np.maximum(x, self._x_min))),
+                        self._early(x)[0])[()]
+
+    def growth(self, z):
+        """Growth factor normalized to D(0) = 1."""
+        return self.growth_unnormalized(z) / self.D0
+
+    def growth_rate(self, z):
+        """Logarithmic growth rate f = dlnD/dlna."""
+        x = self._x(z)
+        return np.where(x >= self._x_min,
+                        self._f(np.maximum(x, self._x_min)),
+                        self._early(x)[1])[()]
+
+
+@lru_cache(maxsize=128)
+def growth_table(Om, Or, OL):
+    """Shared GrowthTable for a cosmology, built on first use."""
+    return GrowthTable(Om, Or, OL)
@@ -0,0 +1,232 @@
+"""
+Halo mass function engine
+=========================
+
+Linear power spectrum P(k) = A k^ns T(k)^2, with T(k) either the
+Eisenstein & Hu (1998) zero-baryon ("no-wiggle") fit or a tabulated
+transfer function, normalised to sigma_8. The top-hat variance
+
+    sigma^2(M) = int dlnk  k^3 P(k) / (2 pi^2)  W^2(k R),   M = 4/3 pi rho_m R^3
+
+is evaluated once on a log-mass grid at z = 0; sigma(M, z) = sigma(M) D(z)
+and its inverse are spline lookups, so every query below is an array
+call. Mass functions are given per unit ln M,
+
+    dn/dlnM = (rho_m / M) f(nu) |dln sigma / dln M|,   nu = delta_c / sigma(M, z),
+
+with f(nu) from Press & Schechter (1974) or Sheth & Tormen (1999).
+
+Masses are in Msun, lengths in comoving Mpc (no h), densities and
+number densities in comoving Mpc^-3.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+from .core import Msun, Mpc, Cosmology, get_cosmology
+from .instrument import kernel
+
+DELTA_C = 1.686
+T_CMB = 2.7255      # K
+
+# np.trapz was renamed np.trapezoid in NumPy 2.0
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
+
+def transfer_eisenstein_hu(k, cosmo):
+    """
+    Eisenstein & Hu (1998) no-wiggle transfer function.
+
+    Parameters:
+        k: wavenumber in 1/Mpc
+        cosmo: Cosmology
+    """
+    h = cosmo.H0_km / 100.0
+    theta = T_CMB / 2.7
+    om_m = cosmo.Om * h**2
+    om_b = cosmo.Ob * h**2
+    fb = cosmo.fb
+
+    s = 44.5 * np.log(9.83 / om_m) / np.sqrt(1 + 10 * om_b**0.75)
+    alpha = 1 - 0.328 * np.log(431 * om_m) * fb + 0.38 * np.log(22.3 * om_m) * fb**2
+    gamma_eff = cosmo.Om * h * (alpha + (1 - alpha) / (1 + (0.43 * k * s)**4))
+    q = (k / h) * theta**2 / gamma_eff
+    L0 = np.log(2 * np.e + 1.8 * q)
+    C0 = 14.2 + 731.0 / (1 + 62.5 * q)
+    return L0 / (L0 + C0 * q**2)
+
+
+def _tophat(x):
+    """Fourier transform of the real-space top-hat window."""
+    x = np.asarray(x, dtype=float)
+    small = x < 1e-3
+    xs = np.where(small, 1.0, x)
+    return np.where(small, 1 - x**2 / 10,
+                    3 * (np.sin(xs) - xs * np.cos(xs)) / xs**3)
+
+
+class HaloMassFunction:
+    """
+    sigma(M), peak heights and halo abundances for one cosmology.
+
+    Parameters:
+        cosmo: Cosmology (default: module parameters)
+        sigma8: amplitude of fluctuations in 8 Mpc/h spheres
+        ns: primordial spectral index
+        transfer: None for Eisenstein & Hu, or a (k [1/Mpc], T) pair of
+                  arrays to interpolate (log-log)
+        logM_range: log10 M [Msun] range of the sigma(M) table
+        n_grid: number of masses in the table
+    """
+
+    @kernel('HaloMassFunction.build')
+    def __init__(self, cosmo=None, sigma8=0.811, ns=0.965, transfer=None,
+                 logM_range=(3.0, 17.0), n_grid=281):
+        self.cosmo = cosmo = get_cosmology(cosmo)
+        self.sigma8 = sigma8
+        self.ns = ns
+        h = cosmo.H0_km / 100.0
+
+        # Comoving matter density in Msun / Mpc^3
+        self.rho_m = cosmo.rho_crit_0 * cosmo.Om * Mpc**3 / Msun
+
+        lnk = np.linspace(np.log(1e-5), np.log(1e3), 4000)
+        k = np.exp(lnk)
+        if transfer is None:
+            T = transfer_eisenstein_hu(k, cosmo)
+        else:
+            k_tab, T_tab = transfer
+            T = np.exp(np.interp(lnk, np.log(k_tab), np.log(T_tab)))
+        Delta2 = k**(3 + ns) * T**2      # k^3 P(k) / (2 pi^2), up to A
+
+        def variance(R):
+            W = _tophat(k[None, :] * np.atleast_1d(R)[:, None])
+            return _trapezoid(Delta2 * W**2, lnk, axis=1)
+
+        norm = sigma8**2 / variance(8.0 / h)[0]
+
+        self.logM = np.linspace(*logM_range, n_grid)
+        R = (3 * 10**self.logM / (4 * np.pi * self.rho_m))**(1.0 / 3.0)
+        ln_sigma = 0.5 * np.log(norm * variance(R))
+
+        # ln sigma(ln M) and its inverse (sigma decreases monotonically)
+        lnM = self.logM * np.log(10)
+        self._ln_sigma = CubicSpline(lnM, ln_sigma)
+        self._dln_sigma = self._ln_sigma.derivative()
+        self._lnM_of_ln_sigma = CubicSpline(ln_sigma[::-1], lnM[::-1])
+
+    def sigma(self, M, z=0.0):
+        """rms linear overdensity in spheres of mass M [Msun] at redshift z."""
+        lnM = np.log(np.asarray(M, dtype=float))
+        return (np.exp(self._ln_sigma(lnM)) * self.cosmo.growth.growth(z))[()]
+
+    def peak_height(self, M, z, delta_c=DELTA_C):
+        """nu(M, z) = delta_c / sigma(M, z)."""
+        return delta_c / self.sigma(M, z)
+
+    @kernel()
+    def mass_at_peak_height(self, nu, z, delta_c=DELTA_C):
+        """Halo mass [Msun] with peak height nu at redshift z (broadcasting)."""
+        sigma0 = delta_c / (np.asarray(nu) * self.cosmo.growth.growth(z))
+        return np.exp(self._lnM_of_ln_sigma(np.log(sigma0)))[()]
+
+    @kernel()
+    def dndlnM(self, M, z, model='sheth-tormen'):
+        """
+        Halo mass function dn/dlnM in Mpc^-3 (comoving).
+
+        M and z broadcast against each other; model is 'press-schechter'
+        or 'sheth-tormen'.
+        """
+        M = np.asarray(M, dtype=float)
+        lnM = np.log(M)
+        nu = DELTA_C / (np.exp(self._ln_sigma(lnM)) * self.cosmo.growth.growth(z))
+        if model == 'press-schechter':
+            f = np.sqrt(2 / np.pi) * nu * np.exp(-nu**2 / 2)
+        elif model == 'sheth-tormen':
+            A, a, p = 0.3222, 0.707, 0.3
+            anu2 = a * nu**2
+            f = A * np.sqrt(2 * a / np.pi) * (1 + anu2**(-p)) * nu * np.exp(-anu2 / 2)
+        else:
+            raise ValueError(f"unknown mass function model '{model}'")
+        return (self.rho_m / M * f * np.abs(self._dln_sigma(lnM)))[()]
+
+    def _cumulative(self, z, model):
+        """ln M grid and n(>M) on it, one row per redshift in z (1-D)."""
+        lnM = self.logM * np.log(10)
+        dn = self.dndlnM(np.exp(lnM)[None, :], z[:, None], model)
+        # Trapezoid segments, summed from the top of the grid downwards
+        seg = 0.5 * (dn[:, 1:] + dn[:, :-1]) * np.diff(lnM)
+        cum = np.concatenate([np.cumsum(seg[:, ::-1], axis=1)[:, ::-1],
+                              np.zeros((z.size, 1))], axis=1)
+        return lnM, cum
+
+    @kernel()
+    def n_above(self, M, z, model='sheth-tormen'):
+        """
+        Cumulative number density n(>M) in Mpc^-3 (comoving).
+
+        Parameters:
+            M: halo masses [Msun], shape (..., n_M) or scalar
+            z: redshift(s); with an array of z the result has shape
+               z.shape + M.shape
+        """
+        z = np.asarray(z, dtype=float)
+        lnM, cum = self._cumulative(z.ravel(), model)
+        ln_cum = np.log(np.maximum(cum, 1e-300))
+        # Linear interpolation in ln M for all rows at once (clamped to the
+        # grid like np.interp)
+        lnMq = np.log(np.asarray(M, dtype=float))
+        i = np.clip(np.searchsorted(lnM, lnMq) - 1, 0, lnM.size - 2)
+        frac = np.clip((lnMq - lnM[i]) / (lnM[i + 1] - lnM[i]), 0.0, 1.0)
+        out = ln_cum[:, i] * (1 - frac) + ln_cum[:, i + 1] * frac
+        return np.exp(out).reshape(z.shape + lnMq.shape)[()]
+
+    @kernel()
+    def largest_halo(self, z, volume, model='sheth-tormen'):
+        """
+        Mass [Msun] above which one halo is expected in a comoving volume.
+
+        Solves n(>M, z) * volume = 1 on the mass grid for each z; NaN where
+        even the lowest tabulated mass is expected less than once, inf
+        where the crossing lies above the mass grid (n(>M) * volume >= 1
+        up to its top, so the grid cannot locate it).
+
+        Parameters:
+            z: redshift(s)
+            volume: comoving volume in Mpc^3 (scalar or one per z)
+        """
+        z = np.asarray(z, dtype=float)
+        volume = np.broadcast_to(np.asarray(volume, dtype=float), z.shape).ravel()
+        lnM, cum = self._cumulative(z.ravel(), model)
+        N = cum * volume[:, None]
+        # N(>M) decreases with M: take the last grid point with N >= 1 and
+        # interpolate ln N linearly to ln N = 0 within the next interval
+        above = (N >= 1).sum(axis=1) - 1
+        i = np.clip(above, 0, lnM.size - 2)
+        rows = np.arange(N.shape[0])
+        lnN0 = np.log(np.maximum(N[rows, i], 1e-300))
+        lnN1 = np.log(np.maximum(N[rows, i + 1], 1e-300))
+        frac = np.clip(lnN0 / (lnN0 - lnN1), 0.0, 1.0)
+        M = np.exp(lnM[i] + frac * (lnM[i + 1] - lnM[i]))
+        M = np.where(above >= lnM.size - 2, np.inf, M)
+        return np.where(above >= 0, M, np.nan).reshape(z.shape)[()]
+
+
+def halo_mass_function(cosmo=None, sigma8=0.811, ns=0.965):
+    """Shared HaloMassFunction (Eisenstein & Hu transfer), built on first use."""
+    cosmo = get_cosmology(cosmo)
+    # Keyed on the parameters that enter P(k) and D(z) only: GEOM and
+    # interp do not, so scans over them share one table
+    return _halo_mass_function(cosmo.H0_km, cosmo.Om, cosmo.Ob, cosmo.Or, cosmo.OL,
+                               float(sigma8), float(ns))
+
+
+@lru_cache(maxsize=16)
+def _halo_mass_function(H0_km, Om, Ob, Or, OL, sigma8, ns):
+    # Keyed on resolved values, so that positional, keyword and default
+    # arguments share one table
+    cosmo = Cosmology(H0_km=H0_km, Om=Om, Or=Or, OL=OL, Ob=Ob)
+    return HaloMassFunction(cosmo, sigma8, ns)
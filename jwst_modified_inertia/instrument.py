@@ -0,0 +1,173 @@
+"""
+Opt-in instrumentation of numerical kernels
+===========================================
+
+Kernels (table builds and integrations, inverse lookups and root finds,
+array evaluations) are decorated with @kernel. While a profile() block is
+active every call is counted and timed, together with the number of
+points it evaluated (the size of its largest array argument), and
+attributed to the innermost open section(); sections nest into paths
+such as 'analysis_data/galaxies'. Times are inclusive: a kernel that
+calls another kernel (age_at_z building its cosmic-time table) is
+charged for both.
+
+Outside profile() the decorator costs one global lookup per call and
+section() is a no-op.
+
+    from jwst_modified_inertia import instrument
+
+    with instrument.profile() as trace:
+        run_analysis()
+    trace.write_json('trace.json')
+    instrument.print_trace(trace)
+
+Calls made in worker processes (montecarlo with processes > 1) are not
+recorded.
+"""
+
+import contextlib
+import functools
+import json
+import time
+
+import numpy as np
+
+_trace = None
+
+
+class Trace:
+    """Counters and timers collected by one profile() block."""
+
+    def __init__(self):
+        self._stack = []
+        self._sections = {}
+        self._kernels = {}
+        self._t0 = time.perf_counter()
+        self.total_seconds = None
+
+    def _path(self):
+        return '/'.join(self._stack)
+
+    def _add_kernel(self, name, seconds, points):
+        entry = self._kernels.setdefault((self._path(), name), [0, 0.0, 0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] += points
+
+    def _add_section(self, path, seconds):
+        entry = self._sections.setdefault(path, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def to_dict(self):
+        """
+        JSON-serialisable trace.
+
+        Returns:
+            dict with 'total_seconds', 'sections' (path -> calls, seconds),
+            'kernels' (one entry per section and kernel, slowest first)
+            and 'totals' (per kernel, over all sections)
+        """
+        total = self.total_seconds
+        if total is None:
+            total = time.perf_counter() - self._t0
+        kernels = [{'section': path, 'kernel': name, 'calls': n,
+                    'seconds': t, 'points': p}
+                   for (path, name), (n, t, p) in self._kernels.items()]
+        kernels.sort(key=lambda k: -k['seconds'])
+        totals = {}
+        for k in kernels:
+            entry = totals.setdefault(k['kernel'],
+                                      {'calls': 0, 'seconds': 0.0, 'points': 0})
+            for field in ('calls', 'seconds', 'points'):
+                entry[field] += k[field]
+        return {
+            'total_seconds': total,
+            'sections': {path: {'calls': n, 'seconds': t}
+                         for path, (n, t) in self._sections.items()},
+            'kernels': kernels,
+            'totals': totals,
+        }
+
+    def write_json(self, path):
+        """Write to_dict() to a file."""
+        with open(path, 'w') as fh:
+            json.dump(self.to_dict(), fh, indent=1)
+            fh.write('\n')
+
+
+def _points(args):
+    sizes = [a.size for a in args if isinstance(a, np.ndarray)]
+    return max(sizes) if sizes else 1
+
+
+def kernel(name=None):
+    """Decorator counting and timing calls while profiling is enabled."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _trace
+            if trace is None:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                trace._add_kernel(label, time.perf_counter() - t0, _points(args))
+        return wrapper
+    return decorate
+
+
+@contextlib.contextmanager
+def section(name):
+    """Attribute the kernel calls in this block to a (nested) section."""
+    trace = _trace
+    if trace is None:
+        yield
+        return
+    trace._stack.append(name)
+    path = trace._path()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace._add_section(path, time.perf_counter() - t0)
+        trace._stack.pop()
+
+
+@contextlib.contextmanager
+def profile():
+    """Enable recording for the duration of the block; yields the Trace."""
+    global _trace
+    previous = _trace
+    trace = _trace = Trace()
+    try:
+        yield trace
+    finally:
+        trace.total_seconds = time.perf_counter() - trace._t0
+        _trace = previous
+
+
+def enabled():
+    """True inside a profile() block."""
+    return _trace is not None
+
+
+def print_trace(trace, limit=20, file=None):
+    """Human-readable summary: sections, then the slowest kernel entries."""
+    d = trace.to_dict()
+    print(f"Total: {d['total_seconds'] * 1e3:.1f} ms", file=file)
+    w = max([len(p) for p in d['sections']] + [7])
+    if d['sections']:
+        print(f"\n{'section':<{w}s} {'calls':>6s} {'ms':>10s}", file=file)
+        for path, s in d['sections'].items():
+            print(f"{path:<{w}s} {s['calls']:6d} {s['seconds'] * 1e3:10.2f}", file=file)
+    kernels = d['kernels'][:limit]
+    wk = max([len(k['kernel']) for k in kernels] + [6])
+    print(f"\n{'section':<{w}s} {'kernel':<{wk}s} {'calls':>6s} {'ms':>10s} {'points':>10s}",
+          file=file)
+    for k in kernels:
+        print(f"{k['section'] or '-':<{w}s} {k['kernel']:<{wk}s} {k['calls']:6d} "
+              f"{k['seconds'] * 1e3:10.2f} {k['points']:10d}", file=file)
@@ -0,0 +1,220 @@
+"""
+Interpolating functions of modified inertia
+===========================================
+
+The sharing function sets the inertial mass m_i = f(a) m_g, so a body
+with Newtonian acceleration g moves with the acceleration a that solves
+
+    g = mu(x) a,      x = a / a_0,
+
+where mu(x) = f(a) is the interpolating function of MOND. The sharing
+function of Paper 4, f = a / (a + a_0), is the 'simple' one. Variants
+registered here for comparison:
+
+    simple        mu = x / (1 + x)               (the sharing function; default)
+    standard      mu = x / sqrt(1 + x^2)
+    n:<n>         mu = x / (1 + x^n)^(1/n)       (n:1 is simple, n:2 standard)
+    exponential   mu = 1 - exp(-x)
+    rar           a = g / (1 - exp(-sqrt(g/a_0)))   (McGaugh, Lelli & Schombert 2016)
+
+A variant is selected by name through Cosmology.interp ('standard',
+'n:1.5', ...). Every routine that takes a cosmo (collapse timescales,
+growth, infall, figure, grids, thresholds) therefore takes the variant
+with it, and cached results are keyed on it.
+
+Each variant provides both directions on arrays: mu(x), and
+nu(y) = a / g as a function of y = g / a_0. One of them is given in
+closed form; the other is either closed form too (simple, standard, n)
+or solved by a batched Newton iteration in log space (mu of rar, nu of
+exponential), which stops per element once the step is below 1e-13.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .instrument import kernel
+
+NEWTON_TOL = 1e-13
+NEWTON_MAXITER = 50
+
+
+class Interpolation:
+    """
+    One interpolating function, in both directions.
+
+    Parameters:
+        name: registry name (with parameter, e.g. 'n:1.5')
+        mu, nu: mu(x, p) and nu(y, p); at least one of them
+        dlnmu, dlnnu: logarithmic derivatives x mu'/mu and y nu'/nu, for
+                      the Newton inversion when mu or nu is missing
+        param: parameter p passed to the functions (None if unused)
+        doc: one-line description
+    """
+
+    def __init__(self, name, mu=None, nu=None, dlnmu=None, dlnnu=None,
+                 param=None, doc=''):
+        if mu is None and nu is None:
+            raise ValueError(f"interpolation {name!r} needs mu or nu")
+        if (mu is None and dlnnu is None) or (nu is None and dlnmu is None):
+            raise ValueError(f"interpolation {name!r}: the Newton inversion "
+                             "needs the logarithmic derivative of the given function")
+        self.name = name
+        self.doc = doc
+        self.param = param
+        self._mu = mu
+        self._nu = nu
+        self._dlnmu = dlnmu
+        self._dlnnu = dlnnu
+
+    def __repr__(self):
+        return f"Interpolation({self.name!r})"
+
+    @property
+    def closed_form(self):
+        """True if a follows from g without iteration."""
+        return self._nu is not None
+
+    def mu(self, x):
+        """Interpolating function mu(x) = m_i / m_g at x = a / a_0."""
+        if self._mu is not None:
+            return self._mu(np.asarray(x, dtype=float), self.param)
+        # x = y nu(y): solve for y, then mu = y / x
+        x = np.asarray(x, dtype=float)
+        y = _newton(lambda y: y * self._nu(y, self.param),
+                    lambda y: 1 + self._dlnnu(y, self.param),
+                    x, _simple_mu(x) * x)
+        return y / x
+
+    def nu(self, y):
+        """Enhancement a / g at y = g / a_0."""
+        if self._nu is not None:
+            return self._nu(np.asarray(y, dtype=float), self.param)
+        # y = x mu(x): solve for x, then nu = x / y
+        y = np.asarray(y, dtype=float)
+        x = _newton(lambda x: x * self._mu(x, self.param),
+                    lambda x: 1 + self._dlnmu(x, self.param),
+                    y, _simple_nu(y) * y)
+        return x / y
+
+    def acceleration(self, g_newt, a0z):
+        """Modified acceleration a and eta = a / g for Newtonian g."""
+        eta = self.nu(g_newt / a0z)
+        return eta * g_newt, eta
+
+
+@kernel('Interpolation.newton')
+def _newton(h, dlnh, target, guess):
+    """
+    Solve h(u) = target element-wise by Newton's method in ln u.
+
+    dlnh(u) is d ln h / d ln u; guess is the starting u.
+    """
+    target = np.asarray(target, dtype=float)
+    ln_t = np.log(target).ravel()
+    s = np.log(np.broadcast_to(guess, target.shape)).ravel().copy()
+    active = np.flatnonzero(np.isfinite(ln_t) & np.isfinite(s))
+    for _ in range(NEWTON_MAXITER):
+        if active.size == 0:
+            break
+        u = np.exp(s[active])
+        step = (np.log(h(u)) - ln_t[active]) / dlnh(u)
+        s[active] -= step
+        active = active[np.abs(step) > NEWTON_TOL]
+    return np.exp(s).reshape(target.shape)
+
+
+# ---------------------------------------------------------------------
+# Variants
+# ---------------------------------------------------------------------
+
+def _simple_mu(x, p=None):
+    return x / (1 + x)
+
+
+def _simple_nu(y, p=None):
+    return 0.5 + np.sqrt(0.25 + 1 / y)
+
+
+def _standard_mu(x, p=None):
+    return x / np.sqrt(1 + x * x)
+
+
+def _standard_nu(y, p=None):
+    return np.sqrt(0.5 + np.sqrt(0.25 + 1 / (y * y)))
+
+
+def _n_mu(x, n):
+    return x / (1 + x**n)**(1 / n)
+
+
+def _n_nu(y, n):
+    return (0.5 + np.sqrt(0.25 + y**-n))**(1 / n)
+
+
+def _exponential_mu(x, p=None):
+    return -np.expm1(-x)
+
+
+def _exponential_dlnmu(x, p=None):
+    # x / (e^x - 1), written to avoid overflow at large x
+    return x * np.exp(-x) / -np.expm1(-x)
+
+
+def _rar_nu(y, p=None):
+    return -1 / np.expm1(-np.sqrt(y))
+
+
+def _rar_dlnnu(y, p=None):
+    s = np.sqrt(y)
+    return -s * np.exp(-s) / (2 * -np.expm1(-s))
+
+
+# name -> (keyword arguments of Interpolation, default parameter or None)
+INTERPOLATIONS = {
+    'simple': (dict(mu=_simple_mu, nu=_simple_nu,
+                    doc="x / (1 + x): the sharing function"), None),
+    'standard': (dict(mu=_standard_mu, nu=_standard_nu,
+                      doc="x / sqrt(1 + x^2)"), None),
+    'n': (dict(mu=_n_mu, nu=_n_nu, doc="x / (1 + x^n)^(1/n)"), 2.0),
+    'exponential': (dict(mu=_exponential_mu, dlnmu=_exponential_dlnmu,
+                         doc="1 - exp(-x)"), None),
+    'rar': (dict(nu=_rar_nu, dlnnu=_rar_dlnnu,
+                 doc="radial acceleration relation, nu = 1 / (1 - exp(-sqrt(y)))"), None),
+}
+
+
+def register(name, mu=None, nu=None, dlnmu=None, dlnnu=None, param=None, doc=''):
+    """
+    Add a variant to INTERPOLATIONS.
+
+    mu(x, p) and nu(y, p) as for Interpolation; param is the default p of
+    a family, whose members are then named 'name:p'.
+    """
+    if ':' in name:
+        raise ValueError(f"interpolation name {name!r} must not contain ':'")
+    INTERPOLATIONS[name] = (dict(mu=mu, nu=nu, dlnmu=dlnmu, dlnnu=dlnnu, doc=doc),
+                            param)
+    get_interpolation.cache_clear()
+
+
+@lru_cache(maxsize=64)
+def get_interpolation(spec='simple'):
+    """
+    Interpolation for a name such as 'standard' or, for a family, 'n:1.5'
+    (a family name alone uses its default parameter).
+    """
+    name, _, value = str(spec).partition(':')
+    if name not in INTERPOLATIONS:
+        raise ValueError(f"unknown interpolating function {spec!r}; "
+                         f"choose from {sorted(INTERPOLATIONS)}")
+    kwargs, default = INTERPOLATIONS[name]
+    if default is None:
+        if value:
+            raise ValueError(f"interpolating function {name!r} takes no parameter")
+        return Interpolation(name, **kwargs)
+    try:
+        param = float(value) if value else default
+    except ValueError:
+        raise ValueError(f"invalid parameter in {spec!r}")
+    return Interpolation(f"{name}:{param:g}", param=param, **kwargs)
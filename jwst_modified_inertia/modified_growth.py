@@ -0,0 +1,218 @@
+"""
+Scale-dependent linear growth under modified inertia
+====================================================
+
+In the standard growth equation (growth.py) the source term
+(3/2) Omega_m(a) delta is the Newtonian peculiar acceleration of the
+perturbation. Under modified inertia that acceleration is replaced by
+a_mod = eta g from modified_acceleration, with a_0(z) = c H(z) / GEOM:
+
+    delta'' + (2 + dlnE/dx) delta' = (3/2) Omega_m(x) eta(g, a0(x)) delta
+
+    g = G dM / R^2 = (1/2) Omega_m(x) H(x)^2 R delta,   R = a R_L(M)
+
+where x = ln a and R_L is the comoving Lagrangian radius of mass M. Since
+g depends on the scale and on the amplitude of the perturbation, delta is
+evolved at its rms amplitude sigma(M), and all scales are integrated
+together as one ODE system.
+
+The modification acts from baryon-photon decoupling, Z_DECOUPLING = 1090
+(Planck 2018: z_* = 1089.9). Before it the baryons are held by the
+photon pressure, so no source term drives their growth. From then on g
+is far below a_0(z) on every table scale (g / a_0 ~ 1e-6 - 1e-4 at
+decoupling, rising slowly afterwards), so there is no later epoch at
+which the modification sets in. Every scale starts on the standard
+growing mode at Z_DECOUPLING with delta = sigma(M, Z_DECOUPLING) from the
+halo mass function engine.
+
+Linear theory breaks down once sigma_mod reaches NONLINEAR_SIGMA (= 1).
+Each scale is followed only up to that point: its redshift z_nl(M) is
+recorded, D_mod, sigma_mod and nu_mod are nan at lower redshift, and the
+integration stops once every scale has gone nonlinear. The solution is
+stored as a bicubic spline of ln delta over (ln M, x), so D_mod(M, z),
+sigma_mod(M, z), nu_mod(M, z) and z_nl(M) are array lookups.
+
+With eta ~ sqrt(a_0 / g) ~ 10^2 - 10^3, every scale from 10^6 to
+10^14 Msun goes nonlinear between z ~ 800 and z ~ 270 (10^11 Msun at
+z_nl ~ 500), long before the JWST redshifts: the modified nu has no
+linear value there, and section 5 of the report prints z_nl instead.
+Since eta is large from the start, z_nl depends on the starting
+redshift: starting at z = 1000 instead would lower it by about 7%.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from scipy.integrate import solve_ivp
+from scipy.interpolate import RectBivariateSpline
+
+from .core import Msun, c, get_cosmology, modified_acceleration
+from .halo_mass_function import DELTA_C, halo_mass_function
+from .instrument import kernel
+
+# Baryon-photon decoupling, where the modified growth starts
+Z_DECOUPLING = 1090.0
+
+# rms amplitude at which the linear solution is abandoned
+NONLINEAR_SIGMA = 1.0
+
+
+class ModifiedGrowthTable:
+    """
+    Modified linear growth for a grid of mass scales in one cosmology.
+
+    D_mod is normalised like D_norm: it equals the standard D(z)/D(0) at
+    Z_DECOUPLING, so D_mod / D_norm is the enhancement from modified
+    inertia.
+
+    Parameters:
+        cosmo: Cosmology (default: module parameters)
+        logM_range: log10 M [Msun] range of the mass grid
+        n_mass: number of mass scales
+        n_grid: number of output nodes on the ln(1+z) grid
+        sigma8: normalisation of the initial fluctuations
+    """
+
+    @kernel('ModifiedGrowthTable.build')
+    def __init__(self, cosmo=None, logM_range=(6.0, 14.0), n_mass=81,
+                 n_grid=400, sigma8=0.811):
+        self.cosmo = cosmo = get_cosmology(cosmo)
+        hmf = halo_mass_function(cosmo, sigma8)
+        growth = cosmo.growth
+        Om, Or, OL, H0 = cosmo.Om, cosmo.Or, cosmo.OL, cosmo.H0
+
+        self.logM = np.linspace(*logM_range, n_mass)
+        M = 10**self.logM
+        # Comoving Lagrangian radius in m: M = 4/3 pi rho_m0 R_L^3
+        R_L = (3 * M * Msun / (4 * np.pi * cosmo.rho_crit_0 * Om))**(1.0 / 3.0)
+
+        def rhs(x, y):
+            delta, ddelta = y[:n_mass], y[n_mass:]
+            a = np.exp(x)
+            m = Om * a**-3
+            r = Or * a**-4
+            E2 = m + r + OL
+            Om_x = m / E2
+            H2 = H0**2 * E2
+            dlnE = -(3 * m + 4 * r) / (2 * E2)
+            g = 0.5 * Om_x * H2 * a * R_L * np.abs(delta)
+            a0z = c * np.sqrt(H2) / cosmo.GEOM
+            _, eta = modified_acceleration(np.maximum(g, 1e-300), None, a0z=a0z,
+                                           cosmo=cosmo)
+            return np.concatenate([
+                ddelta, -(2 + dlnE) * ddelta + 1.5 * Om_x * eta * delta])
+
+        # One event per scale for its crossing of NONLINEAR_SIGMA, and a
+        # terminal one once every scale has crossed
+        def crossing(k):
+            def event(x, y):
+                return y[k] - NONLINEAR_SIGMA
+            event.direction = 1
+            return event
+
+        def all_nonlinear(x, y):
+            return np.min(y[:n_mass]) - NONLINEAR_SIGMA
+        all_nonlinear.terminal = True
+        all_nonlinear.direction = 1
+
+        x = np.linspace(-np.log1p(Z_DECOUPLING), 0.0, n_grid)
+        delta0 = hmf.sigma(M, Z_DECOUPLING)
+        if np.any(delta0 >= NONLINEAR_SIGMA):
+            raise ValueError(f"scales already nonlinear at z = {Z_DECOUPLING:g}; "
+                             "raise logM_range[0]")
+        y0 = np.concatenate([delta0, growth.growth_rate(Z_DECOUPLING) * delta0])
+        sol = solve_ivp(rhs, (x[0], x[-1]), y0, t_eval=x, method='LSODA',
+                        events=[crossing(k) for k in range(n_mass)] + [all_nonlinear],
+                        rtol=1e-8, atol=1e-12 * delta0.min())
+        if sol.status < 0:
+            raise RuntimeError(f"modified growth solve failed: {sol.message}")
+        # x = ln a of breakdown per scale; +inf if linear until today
+        self._x_nl = np.array([t[0] if t.size else np.inf
+                               for t in sol.t_events[:n_mass]])
+        # Past breakdown the values are not used (growth() returns nan);
+        # hold them at the threshold, also on the nodes after the terminal
+        # event, to keep the spline tame
+        ln_delta = np.full((n_mass, n_grid), np.log(NONLINEAR_SIGMA))
+        ln_delta[:, :sol.t.size] = np.minimum(np.log(sol.y[:n_mass]),
+                                              np.log(NONLINEAR_SIGMA))
+
+        self._x_min = x[0]
+        self._ln_sigma0 = np.log(hmf.sigma(M, 0.0))
+        # ln D_mod = ln(delta / sigma(M, z=0)), i.e. normalised like D_norm
+        self._lnD = RectBivariateSpline(self.logM, x, ln_delta - self._ln_sigma0[:, None])
+        self._hmf = hmf
+
+    def _grid(self, M, z):
+        logM = np.log10(np.asarray(M, dtype=float))
+        x = -np.log1p(np.asarray(z, dtype=float))
+        return np.broadcast_arrays(logM, x)
+
+    def _x_nonlinear(self, logM):
+        return np.interp(logM, self.logM, self._x_nl)
+
+    def nonlinear_redshift(self, M):
+        """
+        Redshift z_nl(M) at which sigma_mod reaches NONLINEAR_SIGMA (M in
+        Msun); nan for scales that stay linear until today.
+        """
+        x_nl = self._x_nonlinear(np.log10(np.asarray(M, dtype=float)))
+        with np.errstate(invalid='ignore'):
+            return np.where(np.isfinite(x_nl), np.expm1(-x_nl), np.nan)[()]
+
+    def growth(self, M, z):
+        """
+        Modified growth factor D_mod(M, z) (M in Msun; broadcasting); nan
+        below z_nl(M), where linear theory no longer applies.
+        """
+        logM, x = self._grid(M, z)
+        lnD = self._lnD.ev(logM, np.maximum(x, self._x_min))
+        # Before decoupling growth is standard
+        D = np.where(x >= self._x_min, np.exp(lnD),
+                     self.cosmo.growth.growth(np.expm1(-x)))
+        return np.where(x > self._x_nonlinear(logM), np.nan, D)[()]
+
+    def enhancement(self, M, z):
+        """D_mod(M, z) / D(z): growth enhancement from modified inertia."""
+        return self.growth(M, z) / self.cosmo.growth.growth(z)
+
+    def sigma(self, M, z):
+        """rms linear overdensity sigma_mod(M, z)."""
+        return self.growth(M, z) * self._hmf.sigma(M, 0.0)
+
+    def peak_height(self, M, z, delta_c=DELTA_C):
+        """Modified peak height nu_mod(M, z) = delta_c / sigma_mod(M, z)."""
+        return delta_c / self.sigma(M, z)
+
+    def tables(self, z):
+        """
+        Full (M, z) grids for the table masses at redshifts z.
+
+        Returns:
+            dict with 'log10_M' and 'z_nl' (n_M,), 'z' (n_z,) and (n_M, n_z)
+            arrays 'D_mod', 'enhancement', 'nu_std', 'nu_mod' (nan below z_nl)
+        """
+        z = np.atleast_1d(np.asarray(z, dtype=float))
+        M = 10**self.logM[:, None]
+        D_mod = self.growth(M, z[None, :])
+        D_std = self.cosmo.growth.growth(z)[None, :]
+        sigma0 = np.exp(self._ln_sigma0)[:, None]
+        return {
+            'log10_M': self.logM,
+            'z_nl': self.nonlinear_redshift(10**self.logM),
+            'z': z,
+            'D_mod': D_mod,
+            'enhancement': D_mod / D_std,
+            'nu_std': DELTA_C / (sigma0 * D_std),
+            'nu_mod': DELTA_C / (sigma0 * D_mod),
+        }
+
+
+def modified_growth_table(cosmo=None):
+    """Shared ModifiedGrowthTable for a cosmology, built on first use."""
+    # Resolved first, so that a change of the module parameters is seen
+    return _modified_growth_table(get_cosmology(cosmo))
+
+
+@lru_cache(maxsize=16)
+def _modified_growth_table(cosmo):
+    return ModifiedGrowthTable(cosmo)
@@ -0,0 +1,181 @@
+"""
+Monte Carlo uncertainty propagation over the JWST catalogue
+===========================================================
+
+Section 2 of run_analysis evaluates each galaxy at its central stellar
+mass, with SFE = 0.1 and overdensity = 5. Here every galaxy is instead
+sampled n_draws times over
+
+    log10 M*     ~ Normal(log10_Mstar, log10_Mstar_err)
+    z            ~ Normal(z_spec, z_err), truncated at z > 0
+    SFE          ~ log-uniform over a range (or fixed)
+    overdensity  ~ log-uniform over a range (or fixed)
+
+and the EASY / FEASIBLE / TIGHT verdicts of section 6 are accumulated.
+
+Draws are processed in chunks of chunk_size per galaxy, so memory is
+bounded independently of n_draws; each chunk returns only counts and a
+histogram of log10 N_collapses. Chunk k always uses the k-th child of
+SeedSequence(seed), so results are reproducible and independent of the
+number of worker processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import (
+    Msun, Myr, jwst_galaxies, time_between, collapse_timescale_batch,
+    VERDICTS, verdict_index, get_cosmology,
+)
+from .analysis import print_header
+from .instrument import kernel
+
+# Histogram of log10 N_collapses used for the streaming quantiles
+LOGN_EDGES = np.linspace(-2.0, 2.0, 801)
+
+
+def _draw(rng, spec, size):
+    """Fixed value, or log-uniform draws for a (low, high) range."""
+    if np.ndim(spec) == 0:
+        return np.full(size, float(spec))
+    lo, hi = np.log(spec[0]), np.log(spec[1])
+    return np.exp(rng.uniform(lo, hi, size))
+
+
+@kernel()
+def _run_chunk(seed_seq, z0, logM0, logM_err, n, sfe, overdensity, z_err,
+               z_start, cosmo):
+    """Evaluate one chunk of n draws per galaxy; return counts and histograms."""
+    rng = np.random.default_rng(seed_seq)
+    shape = (z0.size, n)
+
+    logM = logM0[:, None] + logM_err[:, None] * rng.standard_normal(shape)
+    z = z0[:, None] + z_err * rng.standard_normal(shape)
+    # Truncate at z > 0 by redrawing the rejected draws (at least half are
+    # accepted for z_spec >= 0)
+    bad = np.flatnonzero(z <= 0)
+    while bad.size:
+        rows = bad // n
+        z.flat[bad] = z0[rows] + z_err * rng.standard_normal(bad.size)
+        bad = bad[z.flat[bad] <= 0]
+    M_bary = 10**logM * Msun / _draw(rng, sfe, shape)
+    delta = _draw(rng, overdensity, shape)
+
+    t_mod = collapse_timescale_batch(M_bary, z, delta, fields=('t_ff_mod_geom_Myr',),
+                                     cosmo=cosmo)['t_ff_mod_geom_Myr']
+    n_coll = time_between(z, z_start, cosmo) / Myr / t_mod
+    n_coll = np.where(z < z_start, n_coll, 0.0)
+
+    verdict = verdict_index(n_coll)
+    counts = np.stack([(verdict == k).sum(axis=1) for k in range(len(VERDICTS))],
+                      axis=1)
+    logn = np.clip(np.log10(np.maximum(n_coll, 1e-300)),
+                   LOGN_EDGES[0], LOGN_EDGES[-1])
+    bins = np.minimum(np.searchsorted(LOGN_EDGES, logn, side='right') - 1,
+                      LOGN_EDGES.size - 2)
+    n_bins = LOGN_EDGES.size - 1
+    hist = np.bincount((np.arange(z0.size)[:, None] * n_bins + bins).ravel(),
+                       minlength=z0.size * n_bins).reshape(z0.size, n_bins)
+    return counts, hist, t_mod.sum(axis=1)
+
+
+def _quantile(hist, q):
+    """Quantile of log10 N_collapses from per-galaxy histograms -> N."""
+    cdf = np.cumsum(hist, axis=1) / hist.sum(axis=1, keepdims=True)
+    i = np.array([np.searchsorted(row, q) for row in cdf])
+    return 10**(0.5 * (LOGN_EDGES[i] + LOGN_EDGES[i + 1]))
+
+
+def monte_carlo_verdicts(n_draws=100_000, galaxies=None, sfe=(0.05, 0.3),
+                         overdensity=(3.0, 10.0), z_err=0.05, z_start=30.0,
+                         chunk_size=65_536, processes=None, seed=0, cosmo=None):
+    """
+    Posterior verdict probabilities for each galaxy.
+
+    Parameters:
+        n_draws: Monte Carlo draws per galaxy
+        galaxies: list in jwst_galaxies format (default: jwst_galaxies)
+        sfe: star formation efficiency, fixed or (low, high) log-uniform
+        overdensity: turnaround overdensity, fixed or (low, high) log-uniform
+        z_err: Gaussian redshift uncertainty
+        z_start: redshift at which the time budget starts (first stars)
+        chunk_size: draws per galaxy evaluated in one vectorized chunk
+        processes: worker processes (None or 1: run in this process)
+        seed: root seed of the SeedSequence
+        cosmo: Cosmology (default: module parameters, as seen by this
+               process; workers receive it explicitly)
+    Returns:
+        dict of per-galaxy arrays: 'name', 'z', 'log10_Mstar', 'n_draws',
+        'p_easy', 'p_feasible', 'p_tight' (with binomial standard errors
+        'p_easy_err' etc.), 'n_coll_p16', 'n_coll_median', 'n_coll_p84',
+        't_mod_mean_Myr'
+    """
+    if galaxies is None:
+        galaxies = jwst_galaxies
+    names = [g[0] for g in galaxies]
+    z0 = np.array([g[1] for g in galaxies], dtype=float)
+    logM0 = np.array([g[2] for g in galaxies], dtype=float)
+    logM_err = np.array([g[3] for g in galaxies], dtype=float)
+
+    sizes = [chunk_size] * (n_draws // chunk_size)
+    if n_draws % chunk_size:
+        sizes.append(n_draws % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    cosmo = get_cosmology(cosmo)
+    args = [(ss, z0, logM0, logM_err, n, sfe, overdensity, z_err, z_start, cosmo)
+            for ss, n in zip(seeds, sizes)]
+
+    counts = np.zeros((z0.size, len(VERDICTS)), dtype=np.int64)
+    hist = np.zeros((z0.size, LOGN_EDGES.size - 1), dtype=np.int64)
+    t_sum = np.zeros(z0.size)
+
+    if processes is None or processes == 1:
+        parts = (_run_chunk(*a) for a in args)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=processes)
+        parts = pool.map(_run_chunk, *zip(*args))
+    try:
+        for c, h, t in parts:
+            counts += c
+            hist += h
+            t_sum += t
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    p = counts / n_draws
+    p_err = np.sqrt(p * (1 - p) / n_draws)
+    summary = {
+        'name': np.array(names),
+        'z': z0,
+        'log10_Mstar': logM0,
+        'n_draws': np.full(z0.size, n_draws),
+    }
+    for k, v in enumerate(VERDICTS):
+        summary[f'p_{v.lower()}'] = p[:, k]
+        summary[f'p_{v.lower()}_err'] = p_err[:, k]
+    summary['n_coll_p16'] = _quantile(hist, 0.16)
+    summary['n_coll_median'] = _quantile(hist, 0.5)
+    summary['n_coll_p84'] = _quantile(hist, 0.84)
+    summary['t_mod_mean_Myr'] = t_sum / n_draws
+    return summary
+
+
+def print_monte_carlo_summary(summary):
+    """Print the verdict probabilities in the style of run_analysis."""
+    print_header("MONTE CARLO VERDICT PROBABILITIES")
+    print(f"{'Galaxy':>20s}  {'z':>5s}  {'logM*':>6s}  {'P(EASY)':>8s}  {'P(FEAS)':>8s}  {'P(TIGHT)':>8s}  {'N_coll (16/50/84%)':>20s}")
+    print("-" * 90)
+    for i, name in enumerate(summary['name']):
+        n_range = (f"{summary['n_coll_p16'][i]:.1f}/{summary['n_coll_median'][i]:.1f}"
+                   f"/{summary['n_coll_p84'][i]:.1f}")
+        print(f"{name:>20s}  {summary['z'][i]:5.1f}  {summary['log10_Mstar'][i]:6.1f}  "
+              f"{summary['p_easy'][i]:8.3f}  {summary['p_feasible'][i]:8.3f}  "
+              f"{summary['p_tight'][i]:8.3f}  {n_range:>20s}")
+    print(f"\n{summary['n_draws'][0]:,d} draws per galaxy")
+
+
+if __name__ == '__main__':
+    print_monte_carlo_summary(monte_carlo_verdicts())
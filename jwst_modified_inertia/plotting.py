@@ -0,0 +1,228 @@
+"""
+Paper figure: data and rendering
+================================
+
+figure_data computes every curve of the four-panel summary figure as
+arrays (through the result cache if one is given); render_figures draws
+a FigureData on a headless Agg canvas. matplotlib is imported only inside
+render_figures, so importing this module costs nothing beyond the core.
+"""
+
+import dataclasses
+
+import numpy as np
+
+from .core import (
+    Msun, Myr, jwst_galaxies, get_cosmology, a0, time_between,
+    collapse_timescale_batch, max_stellar_mass_standard,
+)
+from .instrument import section
+from .result_cache import cached
+
+
+@dataclasses.dataclass
+class FigureData:
+    """
+    Everything drawn by render_figures, as arrays.
+
+    Each panel is a dict of arrays (see figure_data); galaxies holds the
+    names, redshifts and masses of the plotted catalogue, and geom the
+    GEOM of a0_now for the axis labels.
+    """
+    a0: dict
+    collapse: dict
+    limits: dict
+    regime: dict
+    galaxies: dict
+    a0_now: float
+    geom: float = 6.0
+
+
+@section('figure_data')
+def figure_data(galaxies=None, cosmo=None, cache=None):
+    """
+    Compute the curves of the four figure panels in one vectorized pass.
+
+    Parameters:
+        galaxies: list in jwst_galaxies format (default: jwst_galaxies)
+        cosmo: Cosmology (default: module parameters)
+        cache: optional result_cache.ResultCache
+    Returns:
+        FigureData
+    """
+    if galaxies is None:
+        galaxies = jwst_galaxies
+    cosmo = get_cosmology(cosmo)
+
+    def compute():
+        # Fig 1: a_0(z)
+        z1 = np.linspace(0, 25, 200)
+
+        # Fig 2: collapse vs available time for a 10^10 Msun cloud
+        z2 = np.linspace(5, 22, 100)
+        r = collapse_timescale_batch(1e10 * Msun, z2,
+                                     fields=('t_ff_std_Myr', 't_ff_mod_geom_Myr'),
+                                     cosmo=cosmo)
+
+        # Fig 3: LCDM maximum stellar mass (SFE=100%, nu=4)
+        z3 = np.linspace(5, 18, 50)
+        lcdm_max = np.log10(max_stellar_mass_standard(z3, sfe=1.0, cosmo=cosmo)[0] / Msun)
+
+        # Fig 4: g/a_0 for different cloud masses at each z
+        z4 = np.linspace(5, 20, 100)
+        logM4 = np.array([9, 10, 11])
+        ratios = collapse_timescale_batch(10.0**logM4[:, None] * Msun, z4[None, :],
+                                          overdensity=5.0, fields=('g_over_a0',),
+                                          cosmo=cosmo)['g_over_a0']
+
+        return {
+            'a0': {'z': z1, 'a0': a0(z1, cosmo)},
+            'collapse': {'z': z2, 't_avail_Myr': time_between(z2, 30, cosmo) / Myr,
+                         **r},
+            'limits': {'z': z3, 'log10_Mstar_100': lcdm_max,
+                       'log10_Mstar_10': lcdm_max - 1.0},
+            'regime': {'z': z4, 'log10_M': logM4, 'g_over_a0': ratios},
+        }
+
+    panels = cached(cache, 'figures', compute, cosmology=cosmo)
+    gal = {'name': [g[0] for g in galaxies],
+           'z': np.array([g[1] for g in galaxies], dtype=float),
+           'log10_Mstar': np.array([g[2] for g in galaxies], dtype=float),
+           'log10_Mstar_err': np.array([g[3] for g in galaxies], dtype=float)}
+    return FigureData(galaxies=gal, a0_now=cosmo.a0_now, geom=cosmo.GEOM, **panels)
+
+
+@section('render_figures')
+def render_figures(data, path='fig_jwst_analysis.png', dpi=150):
+    """
+    Draw the four-panel summary figure from a FigureData and save it.
+
+    matplotlib is imported here, not at module import, and the figure is
+    drawn on an Agg canvas without touching pyplot, so this runs headless
+    and leaves any interactive backend alone.
+
+    Parameters:
+        data: FigureData from figure_data
+        path: output file; the format follows its extension
+        dpi: resolution of raster output
+    Returns:
+        path
+    """
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    with matplotlib.rc_context({'mathtext.fontset': 'cm', 'font.size': 11}):
+        fig = Figure(figsize=(12, 10))
+        FigureCanvasAgg(fig)
+        axes = fig.subplots(2, 2)
+        fig.suptitle("Modified Inertia and JWST Early Massive Galaxies (v2: entanglement sharing)",
+                     fontsize=13, fontweight='bold')
+        gal = data.galaxies
+
+        # ---------------------------------------------------------
+        # Fig 1: a_0(z) evolution
+        # ---------------------------------------------------------
+        ax = axes[0, 0]
+        d = data.a0
+
+        ax.semilogy(d['z'], d['a0'], 'b-', linewidth=2)
+        ax.axhline(data.a0_now, color='gray', linestyle='--', alpha=0.5,
+                   label=rf'$a_0(z{{=}}0) = cH_0/{data.geom:g}$')
+        ax.axhline(1.2e-10, color='green', linestyle=':', alpha=0.5, label=r'Milgrom $a_0 = 1.2\times10^{-10}$')
+        ax.set_xlabel('Redshift $z$')
+        ax.set_ylabel(rf'$a_0(z) = cH(z)/{data.geom:g}$ [m/s$^2$]')
+        ax.set_title(r'Critical acceleration $a_0(z)$')
+
+        # Mark JWST galaxy redshifts
+        for z in gal['z']:
+            ax.axvline(z, color='red', alpha=0.3, linewidth=0.8)
+        ax.legend(fontsize=9)
+
+        # ---------------------------------------------------------
+        # Fig 2: Collapse time vs available time
+        # ---------------------------------------------------------
+        ax = axes[0, 1]
+        d = data.collapse
+        z_arr2 = d['z']
+        t_avail_arr = d['t_avail_Myr']
+        t_mod_arr = d['t_ff_mod_geom_Myr']
+
+        ax.semilogy(z_arr2, t_avail_arr, 'k-', linewidth=2, label='Available time (from $z=30$)')
+        ax.semilogy(z_arr2, d['t_ff_std_Myr'], 'r--', linewidth=2, label=r'Standard $t_{\rm ff}$')
+        ax.semilogy(z_arr2, t_mod_arr, 'b-', linewidth=2, label=r'Modified $t_{\rm ff}$')
+
+        ax.fill_between(z_arr2, t_mod_arr, t_avail_arr,
+                        where=t_mod_arr < t_avail_arr, alpha=0.15, color='blue',
+                        label='Formation window')
+
+        ax.set_xlabel('Redshift $z$')
+        ax.set_ylabel('Timescale [Myr]')
+        ax.set_title(r'Collapse time vs available time ($10^{10}\,M_\odot$ cloud)')
+        ax.legend(fontsize=8, loc='upper right')
+        ax.set_ylim(1, 5000)
+
+        # ---------------------------------------------------------
+        # Fig 3: JWST galaxies on mass-redshift plane
+        # ---------------------------------------------------------
+        ax = axes[1, 0]
+
+        # Plot JWST data
+        ax.errorbar(gal['z'], gal['log10_Mstar'], yerr=gal['log10_Mstar_err'],
+                    fmt='ro', markersize=8, capsize=3, zorder=5)
+        for name, z, logM in zip(gal['name'], gal['z'], gal['log10_Mstar']):
+            ax.annotate(name, (z, logM), fontsize=6, ha='left',
+                        xytext=(5, 5), textcoords='offset points')
+
+        # LCDM maximum (SFE=100%, nu=4)
+        d = data.limits
+        ax.plot(d['z'], d['log10_Mstar_100'], 'r--', linewidth=1.5,
+                label=r'$\Lambda$CDM max (SFE=100%, $\nu$=4)')
+        ax.plot(d['z'], d['log10_Mstar_10'], 'r:', linewidth=1.5,
+                label=r'$\Lambda$CDM max (SFE=10%, $\nu$=4)')
+
+        # Shade the "impossible" region
+        ax.fill_between(d['z'], d['log10_Mstar_100'], 12, alpha=0.1, color='red',
+                        label=r'Impossible in $\Lambda$CDM')
+
+        ax.set_xlabel('Redshift $z$')
+        ax.set_ylabel(r'$\log_{10}(M_\star / M_\odot)$')
+        ax.set_title('JWST galaxies vs $\\Lambda$CDM limits')
+        ax.legend(fontsize=7, loc='upper right')
+        ax.set_xlim(5, 18)
+        ax.set_ylim(6, 12)
+
+        # ---------------------------------------------------------
+        # Fig 4: Enhancement factor and regime
+        # ---------------------------------------------------------
+        ax = axes[1, 1]
+        d = data.regime
+        z_arr3 = d['z']
+
+        for ratios, color, label in zip(d['g_over_a0'], ['green', 'blue', 'red'],
+                                        [r'$10^9\,M_\odot$', r'$10^{10}\,M_\odot$',
+                                         r'$10^{11}\,M_\odot$']):
+            ax.semilogy(z_arr3, ratios, color=color, linewidth=2, label=label)
+
+        ax.axhline(1.0, color='black', linestyle='--', alpha=0.5,
+                   label=r'$g = a_0(z)$ (transition)')
+        ax.fill_between(z_arr3, 0, 1, alpha=0.1, color='blue')
+        ax.text(12, 0.3, 'Deep modified regime\n(entanglement sharing dominant)', fontsize=9,
+                ha='center', style='italic', color='blue')
+
+        ax.set_xlabel('Redshift $z$')
+        ax.set_ylabel(r'$g_{\rm cloud} / a_0(z)$')
+        ax.set_title('Protogalactic clouds: regime check')
+        ax.legend(fontsize=8, loc='upper right')
+        ax.set_ylim(1e-5, 10)
+
+        fig.tight_layout()
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    return path
+
+
+def make_figures(results=None, galaxies=None, cosmo=None, cache=None,
+                 path='fig_jwst_analysis.png'):
+    """Generate figures for the paper (figure_data, then render_figures)."""
+    path = render_figures(figure_data(galaxies, cosmo, cache), path)
+    print(f"\nFigure saved: {path}")
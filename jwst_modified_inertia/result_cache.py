@@ -0,0 +1,195 @@
+"""
+On-disk, content-addressed result cache
+=======================================
+
+Computed arrays (analysis section tables, figure panel data, ...) are
+stored as .npz files named by a SHA-256 hash of everything they depend
+on: the cosmology and model parameters, the input catalogue and the code
+version (a hash of the source files in this directory). Any change to
+one of these gives a new key, so stale entries are never returned; they
+simply age out.
+
+The cache directory is $JWST_MI_CACHE, or ~/.cache/jwst_modified_inertia.
+Its total size is capped (max_bytes); when an insert exceeds the cap the
+least recently used entries (by file modification time, refreshed on
+every hit) are evicted.
+
+Command line:
+    python -m jwst_modified_inertia --cache-info    # location, entries, size
+    python -m jwst_modified_inertia --clear-cache   # remove all entries
+"""
+
+import dataclasses
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .instrument import kernel
+
+DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache',
+                           'jwst_modified_inertia')
+DEFAULT_MAX_BYTES = 512 * 2**20
+
+_code_version = None
+
+
+def code_version():
+    """SHA-256 of the Python sources next to this module (computed once)."""
+    global _code_version
+    if _code_version is None:
+        h = hashlib.sha256()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for path in sorted(glob.glob(os.path.join(here, '*.py'))):
+            with open(path, 'rb') as fh:
+                h.update(os.path.basename(path).encode())
+                h.update(fh.read())
+        _code_version = h.hexdigest()
+    return _code_version
+
+
+def _canonical(obj):
+    """JSON-serialisable, order-stable form of a key component."""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {'__type__': type(obj).__name__,
+                **{k: _canonical(v) for k, v in dataclasses.asdict(obj).items()}}
+    if isinstance(obj, np.ndarray):
+        return {'__array__': hashlib.sha256(np.ascontiguousarray(obj).tobytes()).hexdigest(),
+                'dtype': str(obj.dtype), 'shape': list(obj.shape)}
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in sorted(obj.items())}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, float):
+        return repr(obj)
+    return obj
+
+
+def cache_key(name, **parts):
+    """Hex key for result `name` computed from the given inputs."""
+    payload = json.dumps({'name': name, 'code': code_version(),
+                          'parts': _canonical(parts)}, sort_keys=True)
+    return f"{name}-{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+
+class ResultCache:
+    """
+    Directory of .npz results with an LRU size cap.
+
+    Parameters:
+        directory: cache location (default: $JWST_MI_CACHE or DEFAULT_DIR)
+        max_bytes: total size above which old entries are evicted
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get('JWST_MI_CACHE', DEFAULT_DIR)
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def _entries(self):
+        return glob.glob(os.path.join(self.directory, '*.npz'))
+
+    @kernel()
+    def get(self, key):
+        """Dict of arrays stored under key, or None."""
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                arrays = {k: data[k] for k in data.files}
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return arrays
+
+    @kernel()
+    def put(self, key, arrays):
+        """Store a dict of arrays under key, then enforce the size cap."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix='.npz', dir=self.directory,
+                                   prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                np.savez(fh, **arrays)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+
+    def get_or_compute(self, key, compute):
+        """Cached arrays for key, computing and storing them on a miss."""
+        arrays = self.get(key)
+        if arrays is None:
+            arrays = compute()
+            self.put(key, arrays)
+        return arrays
+
+    def evict(self, max_bytes=None):
+        """Remove least recently used entries until under max_bytes."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        for path in self._entries():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Remove every entry."""
+        self.evict(max_bytes=0)
+
+    def info(self):
+        """Directory, number of entries and total size in bytes."""
+        sizes = [os.path.getsize(p) for p in self._entries()]
+        return {'directory': self.directory, 'entries': len(sizes),
+                'bytes': sum(sizes), 'max_bytes': self.max_bytes}
+
+
+def cached(cache, name, compute, **parts):
+    """
+    compute() -> {section: {column: array}}, through cache if one is given.
+
+    The result is stored under cache_key(name, **parts); with cache=None
+    it is simply computed.
+    """
+    if cache is None:
+        return compute()
+    key = cache_key(name, **parts)
+    return unpack(cache.get_or_compute(key, lambda: pack(compute())))
+
+
+def pack(tables):
+    """Flatten {section: {column: array}} into one dict for .npz storage."""
+    return {f"{s}/{k}": np.asarray(v) for s, cols in tables.items()
+            for k, v in cols.items()}
+
+
+def unpack(arrays):
+    """Inverse of pack."""
+    tables = {}
+    for name, v in arrays.items():
+        s, k = name.split('/', 1)
+        tables.setdefault(s, {})[k] = v
+    return tables
+
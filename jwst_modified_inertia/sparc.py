@@ -0,0 +1,298 @@
+"""
+Rotation curves and the radial acceleration relation at z = 0
+=============================================================
+
+Checks the sharing function against rotation curves in SPARC format
+(Lelli, McGaugh & Schombert 2016), read from local files:
+
+    <galaxy>_rotmod.dat   one file per galaxy (a directory of them, or
+                          single files): header '# Distance = D Mpc',
+                          columns Rad Vobs errV Vgas Vdisk Vbul SBdisk SBbul
+    MassModels_*.mrt      the combined table: the same columns preceded by
+                          the galaxy ID and distance
+
+At every point the observed and baryonic accelerations are
+
+    g_obs = V_obs^2 / R
+    g_bar = (V_gas |V_gas| + Y_disk V_disk^2 + Y_bul V_bul^2) / R
+
+(V_disk and V_bul are tabulated for mass-to-light ratio 1; a negative
+V_gas marks a net outward pull of the gas), and the prediction is
+g_pred = modified_acceleration(g_bar, z=0), i.e. with a_0 = c H0 / GEOM
+and the interpolating function of the cosmology.
+
+RotationCurves keeps all points of all galaxies in flat arrays with
+segment offsets, so the prediction and the statistics for the whole
+sample are a few array operations, and per-galaxy quantities are
+reductions over the segments. predicted_acceleration and the statistics
+also take an array of GEOM values, evaluated in one call along a leading
+axis.
+
+    python -m jwst_modified_inertia.sparc PATH
+"""
+
+import glob
+import os
+import re
+import sys
+
+import numpy as np
+
+from .core import c, kpc, get_cosmology, modified_acceleration
+from .analysis import print_header
+from .instrument import kernel
+
+# Point columns, in file order (SB_* in Lsun / pc^2, the rest in kpc and km/s)
+SPARC_COLUMNS = ('R_kpc', 'V_obs', 'e_V_obs', 'V_gas', 'V_disk', 'V_bul',
+                 'SB_disk', 'SB_bul')
+
+# Mass-to-light ratios at 3.6 micron of McGaugh, Lelli & Schombert (2016)
+UPSILON_DISK = 0.5
+UPSILON_BULGE = 0.7
+
+_DISTANCE = re.compile(r'Distance\s*=\s*([0-9.eE+-]+)')
+
+
+class RotationCurves:
+    """
+    Points of many rotation curves as flat arrays.
+
+    Parameters:
+        names: galaxy names, one per segment
+        offsets: n_galaxies + 1 indices; galaxy i holds the points
+                 offsets[i]:offsets[i + 1]
+        columns: {name: flat array} for the names in SPARC_COLUMNS
+        distance_Mpc: distance per galaxy (nan if unknown)
+    """
+
+    def __init__(self, names, offsets, columns, distance_Mpc=None):
+        self.names = tuple(names)
+        self.offsets = np.asarray(offsets, dtype=np.intp)
+        self.columns = {k: np.asarray(columns[k], dtype=float) for k in SPARC_COLUMNS}
+        self.distance_Mpc = (np.full(len(self.names), np.nan) if distance_Mpc is None
+                             else np.asarray(distance_Mpc, dtype=float))
+        if self.offsets.shape != (len(self.names) + 1,) or np.any(np.diff(self.offsets) <= 0):
+            raise ValueError("offsets must rise strictly, one segment per galaxy")
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, name):
+        """Columns of one galaxy."""
+        i = self.names.index(name)
+        sl = slice(self.offsets[i], self.offsets[i + 1])
+        return {k: v[sl] for k, v in self.columns.items()}
+
+    @property
+    def n_points(self):
+        return int(self.offsets[-1])
+
+    @property
+    def galaxy_index(self):
+        """Galaxy number of every point."""
+        return np.repeat(np.arange(len(self.names)), np.diff(self.offsets))
+
+    def g_obs(self):
+        """Observed centripetal acceleration V_obs^2 / R in m/s^2."""
+        v = self.columns['V_obs'] * 1e3
+        return v * v / (self.columns['R_kpc'] * kpc)
+
+    def e_log_g_obs(self):
+        """Uncertainty of log10 g_obs from that of V_obs (dex)."""
+        return 2 / np.log(10) * self.columns['e_V_obs'] / self.columns['V_obs']
+
+    def g_bar(self, upsilon_disk=UPSILON_DISK, upsilon_bulge=UPSILON_BULGE):
+        """Baryonic (Newtonian) acceleration in m/s^2."""
+        col = self.columns
+        v2 = (col['V_gas'] * np.abs(col['V_gas'])
+              + upsilon_disk * col['V_disk']**2
+              + upsilon_bulge * col['V_bul']**2) * 1e6
+        return v2 / (col['R_kpc'] * kpc)
+
+    def select(self, mask):
+        """RotationCurves with the points where mask holds (empty galaxies dropped)."""
+        mask = np.asarray(mask, dtype=bool)
+        counts = np.add.reduceat(mask, self.offsets[:-1])
+        keep = counts > 0
+        offsets = np.concatenate([[0], np.cumsum(counts[keep])])
+        return RotationCurves([n for n, k in zip(self.names, keep) if k], offsets,
+                              {k: v[mask] for k, v in self.columns.items()},
+                              self.distance_Mpc[keep])
+
+
+# ---------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------
+
+def _read_rotmod(path):
+    """Distance and the point columns of one *_rotmod.dat file."""
+    distance = np.nan
+    with open(path) as fh:
+        for line in fh:
+            if not line.startswith('#'):
+                break
+            m = _DISTANCE.search(line)
+            if m:
+                distance = float(m.group(1))
+    data = np.loadtxt(path, comments='#', ndmin=2)
+    if data.shape[1] < len(SPARC_COLUMNS):
+        # Older files omit SBbul
+        data = np.pad(data, ((0, 0), (0, len(SPARC_COLUMNS) - data.shape[1])))
+    return distance, data[:, :len(SPARC_COLUMNS)]
+
+
+def _read_mrt(path):
+    """(name, distance, point columns) per galaxy of the combined table."""
+    galaxies = {}
+    n = len(SPARC_COLUMNS) + 2
+    with open(path) as fh:
+        for line in fh:
+            # Data rows: ID, distance, then the point columns; header
+            # lines do not parse as numbers
+            parts = line.split()
+            if len(parts) != n:
+                continue
+            try:
+                values = [float(p) for p in parts[1:]]
+            except ValueError:
+                continue
+            galaxies.setdefault(parts[0], []).append(values)
+    return [(name, v[0][0], np.array(v)[:, 1:]) for name, v in galaxies.items()]
+
+
+def _rotmod_name(path):
+    name = os.path.basename(path)
+    for suffix in ('_rotmod.dat', '.dat'):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+@kernel()
+def load_rotation_curves(paths):
+    """
+    Read rotation curves into one RotationCurves.
+
+    Parameters:
+        paths: a directory (all *_rotmod.dat files in it), a file (a
+               rotmod file, or a .mrt combined table), or a list of these
+    Returns:
+        RotationCurves; galaxies without points are skipped
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    galaxies = []
+    for path in map(str, paths):
+        if os.path.isdir(path):
+            files = sorted(glob.glob(os.path.join(path, '*_rotmod.dat')))
+            if not files:
+                raise FileNotFoundError(f"no *_rotmod.dat files in {path}")
+            galaxies += [(_rotmod_name(f), *_read_rotmod(f)) for f in files]
+        elif path.lower().endswith('.mrt'):
+            galaxies += _read_mrt(path)
+        else:
+            galaxies.append((_rotmod_name(path), *_read_rotmod(path)))
+    galaxies = [g for g in galaxies if g[2].shape[0]]
+    if not galaxies:
+        raise ValueError("no rotation-curve points read")
+
+    data = np.concatenate([g[2] for g in galaxies])
+    offsets = np.concatenate([[0], np.cumsum([g[2].shape[0] for g in galaxies])])
+    return RotationCurves([g[0] for g in galaxies], offsets,
+                          dict(zip(SPARC_COLUMNS, data.T)),
+                          [g[1] for g in galaxies])
+
+
+# ---------------------------------------------------------------------
+# Prediction and statistics
+# ---------------------------------------------------------------------
+
+def predicted_acceleration(g_bar, geom=None, cosmo=None):
+    """
+    Observed acceleration predicted from g_bar at z = 0.
+
+    geom (default: that of the cosmology) may be an array; its values
+    then run along a leading axis of the result.
+    """
+    cosmo = get_cosmology(cosmo)
+    if geom is None:
+        a0z = cosmo.a0_now
+    else:
+        geom = np.asarray(geom, dtype=float)
+        a0z = (c * cosmo.H0 / geom)[(...,) + (np.newaxis,) * np.ndim(g_bar)]
+    return modified_acceleration(g_bar, 0.0, a0z=a0z, cosmo=cosmo)[0]
+
+
+@kernel()
+def rar_statistics(curves, geom=None, upsilon_disk=UPSILON_DISK,
+                   upsilon_bulge=UPSILON_BULGE, cosmo=None):
+    """
+    Residuals log10(g_obs / g_pred) and their scatter.
+
+    Parameters:
+        curves: RotationCurves
+        geom: GEOM value or array of values (default: that of the cosmology)
+        upsilon_disk, upsilon_bulge: stellar mass-to-light ratios
+        cosmo: Cosmology (default: module parameters)
+    Returns:
+        dict: 'residual' per point, 'mean', 'std' (the scatter), 'rms',
+        'mad' (1.4826 x median absolute deviation) and 'chi2' (with the
+        g_obs errors) over all points, 'galaxy_mean' and 'galaxy_rms' per
+        galaxy; an array geom adds a leading axis to each
+    """
+    g_pred = predicted_acceleration(curves.g_bar(upsilon_disk, upsilon_bulge),
+                                    geom, cosmo)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        res = np.log10(curves.g_obs()) - np.log10(g_pred)
+    starts = curves.offsets[:-1]
+    counts = np.diff(curves.offsets)
+    mean = res.mean(axis=-1)
+    median = np.median(res, axis=-1)
+    return {
+        'residual': res,
+        'mean': mean,
+        'std': res.std(axis=-1),
+        'rms': np.sqrt(np.mean(res * res, axis=-1)),
+        'mad': 1.4826 * np.median(np.abs(res - median[..., None]), axis=-1),
+        'chi2': np.sum((res / curves.e_log_g_obs())**2, axis=-1),
+        'galaxy_mean': np.add.reduceat(res, starts, axis=-1) / counts,
+        'galaxy_rms': np.sqrt(np.add.reduceat(res * res, starts, axis=-1) / counts),
+    }
+
+
+def quality_mask(curves, max_rel_error=0.1, min_radius_kpc=0.0):
+    """
+    Points usable for the RAR: positive accelerations, relative V_obs
+    error below max_rel_error and radius above min_radius_kpc.
+    """
+    col = curves.columns
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((col['R_kpc'] > min_radius_kpc) & (col['V_obs'] > 0)
+                & (col['e_V_obs'] < max_rel_error * col['V_obs'])
+                & (curves.g_bar() > 0))
+
+
+def print_rar_statistics(curves, stats, cosmo=None):
+    """Print the scatter of the RAR residuals for one GEOM."""
+    cosmo = get_cosmology(cosmo)
+    print_header("RADIAL ACCELERATION RELATION (z = 0)")
+    print(f"{len(curves)} galaxies, {curves.n_points:,d} points, "
+          f"a_0 = {cosmo.a0_now:.3e} m/s^2 ({cosmo.interp})")
+    print(f"  mean residual  {stats['mean']:+.3f} dex")
+    print(f"  scatter (std)  {stats['std']:.3f} dex")
+    print(f"  rms            {stats['rms']:.3f} dex")
+    print(f"  robust (MAD)   {stats['mad']:.3f} dex")
+    print(f"  chi2 / point   {stats['chi2'] / curves.n_points:.2f}")
+    worst = np.argsort(-np.abs(stats['galaxy_mean']))[:5]
+    print("\nLargest mean offsets:")
+    for i in worst:
+        print(f"{curves.names[i]:>20s}  {stats['galaxy_mean'][i]:+.3f} dex  "
+              f"(rms {stats['galaxy_rms'][i]:.3f})")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m jwst_modified_inertia.sparc PATH [PATH ...]")
+    curves = load_rotation_curves(sys.argv[1:])
+    curves = curves.select(quality_mask(curves))
+    print_rar_statistics(curves, rar_statistics(curves))
@@ -0,0 +1,263 @@
+"""
+Survey-volume abundance predictions
+===================================
+
+Expected numbers of galaxies above a stellar-mass limit in the redshift
+bins of a survey footprint,
+
+    N = A  int_bin dz  dV/dz dOmega (z)  int_{M* > M*_min} dlnM  dn/dlnM(M, z) F(M, z),
+
+with M the halo mass, M* = SFE fb M, dn/dlnM the halo mass function
+(halo_mass_function.py) and F = 1 where the baryonic cloud M_bary = fb M
+completes k modified collapse times between z_start and z
+(collapse_timescale_batch), 0 otherwise. Counts are given both with F
+(formed in time) and without it (the standard LCDM abundance of hosts).
+
+Comoving distances D_C(z) = (c / H0) int_0^z dz' / E(z') are tabulated
+once per cosmology (DistanceTable, shared through distance_table) as a
+cubic-spline antiderivative in ln(1+z), like cosmic_time.py; volumes use
+the flat-space relations dV/dz dOmega = (c / H0) D_C^2 / E(z) and
+V(<z) = 4 pi D_C^3 / 3.
+
+CountsModel tabulates the cumulative abundances on a (z, M) grid once
+for given SFE, overdensity, k and z_start. Its counts() then takes arrays
+of footprints, one row per survey,
+
+    area_deg2         (S,)
+    z_edges           (S, B + 1) or (B + 1,) shared bin edges
+    log10_Mstar_min   (S,) stellar-mass limit [Msun]
+
+and returns (S, B) counts from interpolation in the tables, with no loop
+over surveys or bins.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .core import (
+    c, Mpc, Msun, Myr, get_cosmology, time_between, collapse_timescale_batch,
+)
+from .halo_mass_function import halo_mass_function
+from .instrument import kernel
+
+DEG2_TO_SR = (np.pi / 180)**2
+
+
+# =============================================================
+# COMOVING DISTANCE AND VOLUME
+# =============================================================
+
+class DistanceTable:
+    """
+    Comoving distance and volume for one (H0, Om, Or, OL) cosmology.
+
+    Parameters:
+        H0: Hubble constant in 1/s
+        Om, Or, OL: matter, radiation and dark-energy density parameters
+        z_max: upper edge of the table
+        n_grid: number of nodes on the ln(1+z) grid
+    """
+
+    @kernel('DistanceTable.build')
+    def __init__(self, H0, Om, Or, OL, z_max=1100.0, n_grid=4096):
+        from scipy.interpolate import CubicSpline
+
+        self.Om = Om
+        self.Or = Or
+        self.OL = OL
+        self.z_max = z_max
+        # Hubble distance c / H0 in Mpc
+        self.D_H = c / H0 / Mpc
+
+        # D_C / D_H = int_0^u e^u' / E(u') du',  u = ln(1+z)
+        u = np.linspace(0.0, np.log1p(z_max), n_grid)
+        integrand = np.exp(u) / self._E(np.expm1(u))
+        self._dc_of_u = CubicSpline(u, integrand).antiderivative()
+
+    def _E(self, z):
+        return np.sqrt(self.Om * (1 + z)**3 + self.Or * (1 + z)**4 + self.OL)
+
+    def comoving_distance(self, z):
+        """Line-of-sight comoving distance to z, in Mpc."""
+        z = np.asarray(z, dtype=float)
+        if np.any(z > self.z_max):
+            raise ValueError(f"redshift above the table limit z_max = {self.z_max:g}")
+        return (self.D_H * self._dc_of_u(np.log1p(z)))[()]
+
+    def differential_volume(self, z):
+        """Comoving volume per unit redshift and steradian, in Mpc^3."""
+        D_C = self.comoving_distance(z)
+        return self.D_H * D_C**2 / self._E(np.asarray(z, dtype=float))
+
+    def comoving_volume(self, z):
+        """Comoving volume within z over the whole sky, in Mpc^3."""
+        return 4 * np.pi / 3 * self.comoving_distance(z)**3
+
+    def volume_between(self, z1, z2, area_deg2=None):
+        """
+        Comoving volume between z1 and z2 in Mpc^3, over area_deg2 square
+        degrees (default: the whole sky). Arrays broadcast.
+        """
+        shell = self.comoving_volume(z2) - self.comoving_volume(z1)
+        if area_deg2 is None:
+            return shell
+        return shell * np.asarray(area_deg2, dtype=float) * DEG2_TO_SR / (4 * np.pi)
+
+    def accuracy(self, z=None):
+        """Maximum relative error of comoving_distance against quad."""
+        from scipy import integrate
+
+        if z is None:
+            z = np.expm1(np.linspace(0.01, np.log1p(self.z_max), 40))
+        z = np.atleast_1d(z)
+        exact = np.array([integrate.quad(lambda x: 1 / self._E(x), 0.0, zi,
+                                         epsabs=0.0, epsrel=1e-12, limit=200)[0]
+                          for zi in z]) * self.D_H
+        return float(np.max(np.abs(self.comoving_distance(z) / exact - 1)))
+
+
+@lru_cache(maxsize=128)
+def _distance_table(H0, Om, Or, OL):
+    return DistanceTable(H0, Om, Or, OL)
+
+
+def distance_table(cosmo=None):
+    """Shared DistanceTable for a cosmology, built on first use."""
+    cosmo = get_cosmology(cosmo)
+    # Keyed on the expansion history only: GEOM and interp do not enter
+    return _distance_table(cosmo.H0, cosmo.Om, cosmo.Or, cosmo.OL)
+
+
+# =============================================================
+# NUMBER COUNTS
+# =============================================================
+
+class CountsModel:
+    """
+    Cumulative abundances of hosts, all and formed in time, on a (z, M) grid.
+
+    Parameters:
+        sfe: star formation efficiency (M* = SFE fb M_halo)
+        overdensity: turnaround overdensity of the collapse
+        k: required number of modified collapse times
+        z_start: redshift at which the time budget starts
+        z_range: redshift range of the table (survey bins must lie in it)
+        n_z: redshift nodes
+        model: mass function ('sheth-tormen' or 'press-schechter')
+        cosmo: Cosmology (default: module parameters)
+    """
+
+    @kernel('CountsModel.build')
+    def __init__(self, sfe=0.1, overdensity=5.0, k=1.0, z_start=30.0,
+                 z_range=(0.0, 20.0), n_z=801, model='sheth-tormen', cosmo=None):
+        self.cosmo = cosmo = get_cosmology(cosmo)
+        self.sfe = sfe
+        hmf = halo_mass_function(cosmo)
+        self.z = np.linspace(*z_range, n_z)
+        self.lnM = hmf.logM * np.log(10)
+        M = np.exp(self.lnM)
+
+        dn = hmf.dndlnM(M[None, :], self.z[:, None], model)
+        M_bary = cosmo.fb * M[None, :] * Msun
+        t_mod = collapse_timescale_batch(M_bary, self.z[:, None], overdensity,
+                                         fields=('t_ff_mod_geom_Myr',),
+                                         cosmo=cosmo)['t_ff_mod_geom_Myr']
+        z_col = np.minimum(self.z, z_start)[:, None]
+        t_avail = np.where(self.z[:, None] < z_start,
+                           time_between(z_col, z_start, cosmo) / Myr, 0.0)
+        formed = t_avail >= k * t_mod
+
+        # n(>M, z) by trapezoid segments summed from the top of the grid,
+        # for all hosts and for those formed in time; a segment counts as
+        # formed by the mean of its end points
+        dlnM = np.diff(self.lnM)
+        self.n_above = {}
+        for key, w in (('standard', 1.0), ('formed', formed.astype(float))):
+            f = dn * w
+            seg = 0.5 * (f[:, 1:] + f[:, :-1]) * dlnM
+            self.n_above[key] = np.concatenate(
+                [np.cumsum(seg[:, ::-1], axis=1)[:, ::-1], np.zeros((n_z, 1))], axis=1)
+        # Comoving volume per unit z and steradian on the z grid
+        self._dVdz = distance_table(cosmo).differential_volume(self.z)
+
+    def _n_above(self, key, lnM_min):
+        """n(>M_min, z) on the z grid for each mass limit: shape (n_z, S)."""
+        lnM_min = np.clip(lnM_min, self.lnM[0], self.lnM[-1])
+        i = np.clip(np.searchsorted(self.lnM, lnM_min) - 1, 0, self.lnM.size - 2)
+        frac = (lnM_min - self.lnM[i]) / (self.lnM[i + 1] - self.lnM[i])
+        table = self.n_above[key]
+        return table[:, i] * (1 - frac) + table[:, i + 1] * frac
+
+    @kernel('CountsModel.counts')
+    def counts(self, area_deg2, z_edges, log10_Mstar_min):
+        """
+        Expected counts per survey and redshift bin.
+
+        Parameters:
+            area_deg2: footprint areas in deg^2, shape (S,) or scalar
+            z_edges: bin edges, (S, B + 1) or shared (B + 1,)
+            log10_Mstar_min: stellar-mass limits [Msun], (S,) or scalar
+        Returns:
+            dict of (S, B) arrays: 'formed' (counts formed in time),
+            'standard' (all hosts above the limit) and 'volume_Mpc3'
+        """
+        area = np.atleast_1d(np.asarray(area_deg2, dtype=float))
+        logM_min = np.atleast_1d(np.asarray(log10_Mstar_min, dtype=float))
+        edges = np.atleast_2d(np.asarray(z_edges, dtype=float))
+        S = np.broadcast_shapes(area.shape, logM_min.shape, edges.shape[:1])[0]
+        area, logM_min = np.broadcast_to(area, (S,)), np.broadcast_to(logM_min, (S,))
+        edges = np.broadcast_to(edges, (S, edges.shape[1]))
+        if edges.min() < self.z[0] or edges.max() > self.z[-1]:
+            raise ValueError(f"bin edges outside the table range "
+                             f"[{self.z[0]:g}, {self.z[-1]:g}]")
+
+        # Halo mass limit of each survey
+        lnM_min = (logM_min * np.log(10) - np.log(self.sfe * self.cosmo.fb))
+        # Position of every edge on the z grid, for linear interpolation of
+        # the cumulative integrals C(z) = int_z0^z (...) dz'
+        j = np.clip(np.searchsorted(self.z, edges) - 1, 0, self.z.size - 2)
+        t = (edges - self.z[j]) / (self.z[j + 1] - self.z[j])
+        cols = np.arange(S)[:, None]
+
+        def binned(integrand):
+            # integrand: (n_z, S) -> per-bin integrals (S, B)
+            seg = 0.5 * (integrand[1:] + integrand[:-1]) * np.diff(self.z)[:, None]
+            C = np.concatenate([np.zeros((1, S)), np.cumsum(seg, axis=0)])
+            C_edges = C[j, cols] * (1 - t) + C[j + 1, cols] * t
+            return np.diff(C_edges, axis=1)
+
+        sr = (area * DEG2_TO_SR)[:, None]
+        out = {key: sr * binned(self._dVdz[:, None] * self._n_above(key, lnM_min))
+               for key in ('formed', 'standard')}
+        out['volume_Mpc3'] = sr * binned(np.broadcast_to(self._dVdz[:, None],
+                                                         (self.z.size, S)))
+        return out
+
+
+def predicted_counts(area_deg2, z_edges, log10_Mstar_min, sfe=0.1, overdensity=5.0,
+                     k=1.0, z_start=30.0, model='sheth-tormen', cosmo=None):
+    """CountsModel(...).counts(...) for a single set of model parameters."""
+    z_max = float(np.max(z_edges))
+    model = CountsModel(sfe, overdensity, k, z_start,
+                        z_range=(0.0, max(20.0, z_max)), model=model, cosmo=cosmo)
+    return model.counts(area_deg2, z_edges, log10_Mstar_min)
+
+
+def compare_counts(expected, observed):
+    """
+    Poisson comparison of predicted and observed counts (broadcasting).
+
+    Returns:
+        dict: 'p_excess' = P(N >= observed), 'p_deficit' = P(N <= observed)
+        and 'log_likelihood' = ln P(observed | expected), element-wise
+    """
+    from scipy.stats import poisson
+
+    expected = np.asarray(expected, dtype=float)
+    observed = np.asarray(observed)
+    return {
+        'p_excess': poisson.sf(observed - 1, expected),
+        'p_deficit': poisson.cdf(observed, expected),
+        'log_likelihood': poisson.logpmf(observed, expected),
+    }
@@ -0,0 +1,283 @@
+"""
+Formation thresholds (vectorized inverse solvers)
+=================================================
+
+Inverse queries on the collapse criterion of sections 2, 4 and 6,
+
+    N(M*, z, delta) = t_avail(z) / t_ff,mod(M* / SFE, z, delta) >= k,
+
+with t_avail the cosmic time since z_start. Each takes whole arrays
+(broadcast against each other) and solves for every element at once:
+
+    formation_redshift   highest z at which a galaxy of stellar mass M*
+                         has N >= k
+    max_formable_mass    largest M* with N >= k at redshift z
+    min_overdensity      smallest turnaround overdensity with N >= k at
+                         the galaxy's (M*, z)
+
+N decreases monotonically with M* and increases with the overdensity, so
+those two are bracketed directly on a range in log10. N is not monotonic
+in z at low redshift, so formation_redshift first scans a grid in
+ln(1+z) downwards from z_start for the highest feasible node and then
+refines the crossing above it.
+
+The refinement (bracketed_root) is the Illinois variant of regula falsi,
+run on arrays: every element keeps its own bracket, and each iteration
+evaluates only the elements that have not yet converged. The times come
+from the cached cosmic-time table (cosmic_time.py) and, at fixed z, are
+looked up once, so an iteration is a single collapse_timescale_batch
+call on the unconverged elements.
+"""
+
+import numpy as np
+
+from .core import Msun, Myr, get_cosmology, time_between, collapse_timescale_batch
+from .instrument import kernel
+
+
+def available_time(z, z_start=30.0, cosmo=None):
+    """Cosmic time from z_start to z in Myr (0 at z >= z_start)."""
+    z = np.asarray(z, dtype=float)
+    return np.where(z < z_start,
+                    time_between(np.minimum(z, z_start), z_start, cosmo) / Myr,
+                    0.0)
+
+
+def n_collapses(log10_Mstar, z, overdensity=5.0, sfe=0.1, z_start=30.0,
+                cosmo=None, t_avail=None):
+    """
+    Number of modified collapse times available, as in section 6.
+
+    Arrays are broadcast against each other; N = 0 at z >= z_start.
+    t_avail (Myr) can be passed when it is already known for these z.
+    """
+    if t_avail is None:
+        t_avail = available_time(z, z_start, cosmo)
+    M_bary = 10**np.asarray(log10_Mstar, dtype=float) * Msun / sfe
+    t_mod = collapse_timescale_batch(M_bary, z, overdensity,
+                                     fields=('t_ff_mod_geom_Myr',),
+                                     cosmo=cosmo)['t_ff_mod_geom_Myr']
+    return t_avail / t_mod
+
+
+@kernel()
+def bracketed_root(f, lo, hi, f_lo=None, f_hi=None, xtol=1e-9, maxiter=100):
+    """
+    Element-wise roots of f on the brackets [lo, hi] (Illinois method).
+
+    Parameters:
+        f: f(x, idx) -> values at x (1-D) for the elements idx (indices
+           into lo and hi), so that parameter arrays can be indexed along
+        lo, hi: 1-D arrays of bracket ends
+        f_lo, f_hi: f at lo and hi, if already known
+        xtol: absolute tolerance on x
+        maxiter: maximum number of iterations
+    Returns:
+        x: roots; nan where f(lo) and f(hi) have the same sign
+    """
+    a = np.array(lo, dtype=float)
+    b = np.array(hi, dtype=float)
+    idx = np.arange(a.size)
+    fa = f(a, idx) if f_lo is None else np.array(f_lo, dtype=float)
+    fb = f(b, idx) if f_hi is None else np.array(f_hi, dtype=float)
+
+    x = np.full(a.size, np.nan)
+    x[fa == 0] = a[fa == 0]
+    x[fb == 0] = b[fb == 0]
+    # side of the last update: +1 moved a, -1 moved b, 0 none yet
+    side = np.zeros(a.size, dtype=np.int8)
+    active = np.flatnonzero((fa * fb < 0) & np.isnan(x))
+
+    for _ in range(maxiter):
+        if active.size == 0:
+            break
+        ia, ib, fai, fbi = a[active], b[active], fa[active], fb[active]
+        c = (ia * fbi - ib * fai) / (fbi - fai)
+        c = np.clip(c, np.minimum(ia, ib), np.maximum(ia, ib))
+        fc = f(c, active)
+
+        # Keep the sign change in [a, c] or [c, b]; halve the stale end's
+        # value when the same end is kept twice (Illinois)
+        move_b = fc * fbi > 0
+        move_a = fc * fai > 0
+        s = side[active]
+        a[active] = np.where(move_a, c, ia)
+        b[active] = np.where(move_b, c, ib)
+        fa[active] = np.where(move_a, fc, np.where(move_b & (s == -1), fai / 2, fai))
+        fb[active] = np.where(move_b, fc, np.where(move_a & (s == 1), fbi / 2, fbi))
+        side[active] = np.where(move_b, -1, np.where(move_a, 1, 0))
+
+        done = (fc == 0) | (np.abs(b[active] - a[active]) < xtol)
+        x[active[done]] = c[done]
+        active = active[~done]
+
+    x[active] = (a[active] + b[active]) / 2
+    return x
+
+
+@kernel()
+def formation_redshift(log10_Mstar, k=1.0, sfe=0.1, overdensity=5.0,
+                       z_start=30.0, z_min=0.0, n_scan=64, xtol=1e-9,
+                       cosmo=None):
+    """
+    Highest redshift at which N(M*, z) >= k.
+
+    Parameters:
+        log10_Mstar: log10 stellar mass in Msun (array)
+        k: required number of collapse times
+        sfe, overdensity, z_start: as collapse criterion above
+        z_min: lowest redshift searched
+        n_scan: nodes of the ln(1+z) scan; a feasible window narrower
+                than the node spacing can be missed
+        xtol: tolerance in ln(1+z)
+        cosmo: Cosmology (default: module parameters)
+    Returns:
+        z: array of the broadcast shape; nan where N < k at every
+           z in [z_min, z_start]
+    """
+    cosmo = get_cosmology(cosmo)
+    logM, k, sfe, delta = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (log10_Mstar, k, sfe, overdensity)))
+    shape = logM.shape
+    logM, k, sfe, delta = (v.ravel() for v in (logM, k, sfe, delta))
+
+    def f(x, idx):
+        return n_collapses(logM[idx], np.expm1(x), delta[idx], sfe[idx],
+                           z_start, cosmo) - k[idx]
+
+    # Scan downwards from z_start; each element stops at its first
+    # (i.e. highest) feasible node, whose upper neighbour brackets the root
+    nodes = np.linspace(np.log1p(z_min), np.log1p(z_start), n_scan)
+    x_lo = np.full(logM.size, np.nan)
+    f_lo = np.full(logM.size, np.nan)
+    f_hi = f(np.full(logM.size, nodes[-1]), np.arange(logM.size))
+    f_next = f_hi.copy()
+    pending = np.flatnonzero(f_hi < 0)
+    x_lo[f_hi >= 0] = nodes[-1]
+    for j in range(n_scan - 2, -1, -1):
+        if pending.size == 0:
+            break
+        fj = f(np.full(pending.size, nodes[j]), pending)
+        found = fj >= 0
+        x_lo[pending[found]] = nodes[j]
+        f_lo[pending[found]] = fj[found]
+        f_next[pending[~found]] = fj[~found]
+        f_hi[pending[found]] = f_next[pending[found]]
+        pending = pending[~found]
+
+    z = np.full(logM.size, np.nan)
+    at_top = x_lo == nodes[-1]
+    z[at_top] = z_start
+    inner = np.flatnonzero(~np.isnan(x_lo) & ~at_top)
+    if inner.size:
+        x_hi = x_lo[inner] + (nodes[1] - nodes[0])
+        x = bracketed_root(lambda x, i: f(x, inner[i]), x_lo[inner], x_hi,
+                           f_lo[inner], f_hi[inner], xtol=xtol)
+        z[inner] = np.expm1(x)
+    return z.reshape(shape)
+
+
+@kernel()
+def max_formable_mass(z, k=1.0, sfe=0.1, overdensity=5.0, z_start=30.0,
+                      log10_range=(4.0, 16.0), xtol=1e-9, cosmo=None):
+    """
+    Largest stellar mass with N(M*, z) >= k.
+
+    Parameters:
+        z: redshift (array)
+        k, sfe, overdensity, z_start: as collapse criterion above
+        log10_range: searched range of log10 M* [Msun]
+        xtol: tolerance in log10 M*
+        cosmo: Cosmology (default: module parameters)
+    Returns:
+        log10 M* of the broadcast shape; -inf where even the lower end of
+        log10_range fails, +inf where the upper end still passes
+    """
+    cosmo = get_cosmology(cosmo)
+    z, k, sfe, delta = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (z, k, sfe, overdensity)))
+    shape = z.shape
+    z, k, sfe, delta = (v.ravel() for v in (z, k, sfe, delta))
+    t_avail = available_time(z, z_start, cosmo)
+
+    def f(x, idx):
+        return n_collapses(x, z[idx], delta[idx], sfe[idx], cosmo=cosmo,
+                           t_avail=t_avail[idx]) - k[idx]
+
+    return _solve_on_range(f, z.size, log10_range, xtol,
+                           below=-np.inf, above=np.inf).reshape(shape)
+
+
+@kernel()
+def min_overdensity(log10_Mstar, z, k=1.0, sfe=0.1, z_start=30.0,
+                    log10_range=(-2.0, 6.0), xtol=1e-9, cosmo=None):
+    """
+    Smallest turnaround overdensity with N(M*, z, delta) >= k.
+
+    Parameters:
+        log10_Mstar: log10 stellar mass in Msun (array)
+        z: redshift (array)
+        k, sfe, z_start: as collapse criterion above
+        log10_range: searched range of log10 overdensity
+        xtol: tolerance in log10 overdensity
+        cosmo: Cosmology (default: module parameters)
+    Returns:
+        overdensity of the broadcast shape; inf where the upper end of
+        log10_range is not enough, the lower end where that already
+        suffices
+    """
+    cosmo = get_cosmology(cosmo)
+    logM, z, k, sfe = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (log10_Mstar, z, k, sfe)))
+    shape = logM.shape
+    logM, z, k, sfe = (v.ravel() for v in (logM, z, k, sfe))
+    t_avail = available_time(z, z_start, cosmo)
+
+    # N increases with overdensity: solve k - N so that f decreases as
+    # for max_formable_mass
+    def f(x, idx):
+        return k[idx] - n_collapses(logM[idx], z[idx], 10**x, sfe[idx],
+                                    cosmo=cosmo, t_avail=t_avail[idx])
+
+    x = _solve_on_range(f, logM.size, log10_range, xtol,
+                        below=log10_range[0], above=np.inf)
+    return (10**x).reshape(shape)
+
+
+def _solve_on_range(f, n, log10_range, xtol, below, above):
+    """
+    Root of a decreasing f on a fixed range; `below` where f(lo) < 0 and
+    `above` where f(hi) >= 0.
+    """
+    idx = np.arange(n)
+    lo = np.full(n, float(log10_range[0]))
+    hi = np.full(n, float(log10_range[1]))
+    f_lo = f(lo, idx)
+    f_hi = f(hi, idx)
+    x = np.full(n, np.nan)
+    x[f_lo < 0] = below
+    x[f_hi >= 0] = above
+    inner = np.flatnonzero((f_lo >= 0) & (f_hi < 0))
+    if inner.size:
+        x[inner] = bracketed_root(lambda x, i: f(x, inner[i]), lo[inner], hi[inner],
+                                  f_lo[inner], f_hi[inner], xtol=xtol)
+    return x
+
+
+def evaluate_thresholds(chunk, k=1.0, sfe=0.1, overdensity=5.0, z_start=30.0,
+                        cosmo=None):
+    """
+    Formation boundaries for one catalogue chunk (see catalogue.iter_catalogue).
+
+    Returns:
+        dict of arrays: 'z_form' (formation_redshift), 'log10_Mstar_max'
+        at the chunk redshifts (max_formable_mass) and 'min_overdensity'
+    """
+    return {
+        'z_form': formation_redshift(chunk['log10_Mstar'], k, sfe, overdensity,
+                                     z_start, cosmo=cosmo),
+        'log10_Mstar_max': max_formable_mass(chunk['z'], k, sfe, overdensity,
+                                             z_start, cosmo=cosmo),
+        'min_overdensity': min_overdensity(chunk['log10_Mstar'], chunk['z'], k,
+                                           sfe, z_start, cosmo=cosmo),
+    }
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep the result cache of CLI runs out of the user's cache directory
+os.environ['JWST_MI_CACHE'] = tempfile.mkdtemp(prefix='jwst_mi_test_cache_')
@@ -0,0 +1,35 @@
+import contextlib
+import io
+
+import pytest
+
+from jwst_modified_inertia import cli
+
+
+def run(*argv):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        cli.main(['--no-cache', *argv])
+    return out.getvalue()
+
+
+@pytest.mark.parametrize('sections', ['3', '5'])
+def test_no_radiation(sections):
+    text = run('--Or', '0', '-s', sections)
+    assert 'nan' not in text.lower()
+
+
+def test_section_5_reports_nonlinear_redshift():
+    text = run('-s', '5')
+    assert 'from decoupling (z = 1090)' in text
+    rows = [line.split() for line in text.splitlines()
+            if line.split()[:1] in (['9'], ['11'], ['13'])]
+    assert len(rows) == 3
+    # z_nl falls with mass; nu_mod has no linear value at z = 12
+    assert float(rows[0][1]) > float(rows[1][1]) > float(rows[2][1]) > 12
+    assert all(row[-1] == 'nonlinear' for row in rows)
+
+
+def test_labels_follow_geom():
+    text = run('--geom', '5', '-s', '1')
+    assert 'cH_0/5 ' in text and 'cH(z)/5' in text and '/6' not in text
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import jwst_modified_inertia as jmi
+from jwst_modified_inertia.fast_collapse import (
+    FAST_FIELDS, CollapseEvaluator, collapse_timescale_fast,
+)
+from jwst_modified_inertia.interpolation import INTERPOLATIONS
+
+# Error bound of the reduced form against collapse_timescale_batch
+RTOL = 1e-12
+INTERPS = sorted(INTERPOLATIONS) + ['n:1.5']
+
+
+@pytest.fixture(scope='module')
+def clouds():
+    rng = np.random.default_rng(4)
+    n = 20_000
+    return (10**rng.uniform(5.0, 16.0, n) * jmi.Msun, rng.uniform(0.0, 50.0, n),
+            10**rng.uniform(-1.0, 4.0, n))
+
+
+@pytest.mark.parametrize('interp', INTERPS)
+@pytest.mark.parametrize('geom', [4.0, 6.0, 9.0])
+def test_evaluator_matches_batch(clouds, interp, geom):
+    M, z, delta = clouds
+    base = jmi.PLANCK18.replace(interp=interp)
+    exact = jmi.collapse_timescale_batch(M, z, delta, fields=FAST_FIELDS,
+                                         cosmo=base.replace(GEOM=geom))
+    fast = CollapseEvaluator(M, z, base)(delta, geom)
+    for k in FAST_FIELDS:
+        np.testing.assert_allclose(fast[k], exact[k], rtol=RTOL, err_msg=k)
+
+
+@pytest.mark.parametrize('interp', ['simple', 'rar'])
+def test_mass_factor_and_walker_axis(clouds, interp):
+    M, z, _ = clouds
+    M, z = M[:500], z[:500]
+    cosmo = jmi.PLANCK18.replace(interp=interp)
+    delta = np.array([2.0, 5.0, 20.0])[:, None]
+    geom = np.array([3.0, 6.0, 12.0])[:, None]
+    sfe = np.array([0.05, 0.1, 0.5])[:, None]
+    fast = CollapseEvaluator(M, z, cosmo)(delta, geom, mass_factor=0.1 / sfe)
+    for w in range(3):
+        exact = jmi.collapse_timescale_batch(
+            M * 0.1 / sfe[w, 0], z, delta[w, 0], fields=FAST_FIELDS,
+            cosmo=cosmo.replace(GEOM=geom[w, 0]))
+        for k in FAST_FIELDS:
+            np.testing.assert_allclose(fast[k][w], exact[k], rtol=RTOL, err_msg=k)
+
+
+def test_scalar_inputs():
+    exact = jmi.collapse_timescale_batch(1e10 * jmi.Msun, 10.0, 5.0, fields=FAST_FIELDS)
+    fast = collapse_timescale_fast(1e10 * jmi.Msun, 10.0, 5.0)
+    for k in FAST_FIELDS:
+        assert float(fast[k]) == pytest.approx(float(exact[k]), rel=RTOL)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from jwst_modified_inertia.geom_fit import FormationLikelihood, sample, summarize
+
+
+@pytest.fixture(scope='module')
+def likelihood():
+    return FormationLikelihood(params=('geom', 'log10_sfe', 'log10_overdensity'))
+
+
+def test_ensemble_call_matches_single_rows(likelihood):
+    theta = np.array([[6.0, -1.0, 0.7], [20.0, -0.5, 1.5], [2.0, -1.8, 0.2]])
+    together = likelihood(theta)
+    apart = np.array([likelihood(row[None])[0] for row in theta])
+    np.testing.assert_allclose(together, apart)
+
+
+def test_outside_prior_is_minus_inf(likelihood):
+    lp = likelihood(np.array([[0.5, -1.0, 0.7], [6.0, 0.5, 0.7], [6.0, -1.0, 0.7]]))
+    assert lp[0] == -np.inf and lp[1] == -np.inf and np.isfinite(lp[2])
+
+
+def test_sampler_reproducible_across_processes():
+    L = FormationLikelihood()
+    a = sample(L, n_walkers=16, n_steps=50, n_chains=2, seed=3)
+    b = sample(L, n_walkers=16, n_steps=50, n_chains=2, processes=2, seed=3)
+    np.testing.assert_array_equal(a['chain'], b['chain'])
+    assert a['chain'].shape == (2, 50, 16, 1)
+    lo, mid, hi = summarize(a)['geom']
+    assert L.bounds[0, 0] <= lo <= mid <= hi <= L.bounds[0, 1]
+
+
+def test_walker_count_checked():
+    with pytest.raises(ValueError):
+        sample(FormationLikelihood(), n_walkers=15)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import jwst_modified_inertia as jmi
+from jwst_modified_inertia.grid import CollapseGrid, build_grid
+from jwst_modified_inertia.thresholds import n_collapses
+
+
+def test_grid_values_and_resume(tmp_path):
+    path = tmp_path / 'grid'
+    axes = dict(log10_Mstar=np.linspace(8, 11, 4), z=np.linspace(6, 14, 5),
+                overdensity=(3.0, 5.0), sfe=(0.1,), geom=(4.0, 6.0))
+    grid = build_grid(path, **axes, chunks=(2, 5, 2, 1, 2))
+    assert grid.complete and grid['n_collapses'].shape == (4, 5, 2, 1, 2)
+    ref = n_collapses(9.0, 10.0, 5.0, 0.1, cosmo=jmi.get_cosmology().replace(GEOM=4.0))
+    got = grid.select('n_collapses', log10_Mstar=9.0, z=10.0, overdensity=5.0,
+                      sfe=0.1, geom=4.0)
+    assert float(got) == pytest.approx(ref, rel=1e-12)
+
+    # Same arguments: nothing to redo; different ones: refused
+    assert CollapseGrid(build_grid(path, **axes, chunks=(2, 5, 2, 1, 2)).path).complete
+    with pytest.raises(ValueError):
+        build_grid(path, **{**axes, 'sfe': (0.2,)}, chunks=(2, 5, 2, 1, 2))
+
+
+def test_grid_refuses_to_resume_across_code_versions(tmp_path, monkeypatch):
+    import jwst_modified_inertia.grid as grid_module
+
+    path = tmp_path / 'grid'
+    axes = dict(log10_Mstar=(9.0, 10.0), z=(8.0, 10.0))
+    build_grid(path, **axes)
+    monkeypatch.setattr(grid_module, 'code_version', lambda: 'other')
+    with pytest.raises(ValueError):
+        build_grid(path, **axes)
+    assert build_grid(path, **axes, overwrite=True).complete
+
+
+def test_infall_fields(tmp_path):
+    from jwst_modified_inertia.core import Msun
+    from jwst_modified_inertia.grid import INFALL_SHELLS
+    from jwst_modified_inertia.infall import infall_collapse
+
+    grid = build_grid(tmp_path / 'grid', log10_Mstar=(9.0, 10.0), z=(8.0, 12.0),
+                      geom=(5.0, 6.0), fields=('t_ff_mod_geom_Myr', 'n_collapses',
+                                               't_infall_Myr', 'n_collapses_infall',
+                                               'bracket_error'))
+    cosmo = jmi.get_cosmology().replace(GEOM=5.0)
+    ref = infall_collapse(10.0**np.array([9.0, 10.0])[:, None] * Msun / 0.1,
+                          np.array([8.0, 12.0]), 5.0, n_shells=INFALL_SHELLS,
+                          cosmo=cosmo)
+    t = grid.select('t_infall_Myr', overdensity=5.0, sfe=0.1, geom=5.0)
+    np.testing.assert_allclose(t, ref['t_collapse_Myr'], rtol=1e-12)
+    np.testing.assert_allclose(grid['bracket_error'], grid['t_ff_mod_geom_Myr']
+                               / grid['t_infall_Myr'] - 1, rtol=1e-12)
+    np.testing.assert_allclose(grid['n_collapses_infall'] * grid['t_infall_Myr'],
+                               grid['n_collapses'] * grid['t_ff_mod_geom_Myr'],
+                               rtol=1e-12)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import jwst_modified_inertia as jmi
+from jwst_modified_inertia import core
+from jwst_modified_inertia.growth import GrowthTable
+from jwst_modified_inertia.halo_mass_function import halo_mass_function
+from jwst_modified_inertia.modified_growth import (
+    NONLINEAR_SIGMA, Z_DECOUPLING, modified_growth_table,
+)
+
+
+def test_growth_without_radiation():
+    table = GrowthTable(0.315, 0.0, 0.685)
+    ref = GrowthTable(0.315, 1e-12, 0.685)
+    z = np.array([0.0, 1.0, 10.0, 1e3])
+    np.testing.assert_allclose(table.growth(z), ref.growth(z), rtol=1e-8)
+    # Matter era: D = a, f = 1, also above the table
+    assert table.growth_rate(1e9) == 1.0
+    assert table.growth_unnormalized(1e9) == pytest.approx(1 / (1 + 1e9))
+
+
+def test_halo_mass_function_shared_across_geom_and_interp():
+    cosmo = jmi.PLANCK18
+    assert halo_mass_function(cosmo) is halo_mass_function(
+        cosmo.replace(GEOM=3.0, interp='standard'))
+    assert halo_mass_function(cosmo) is not halo_mass_function(cosmo.replace(Om=0.3))
+
+
+def test_largest_halo_off_grid_is_inf():
+    hmf = halo_mass_function()
+    M = hmf.largest_halo([0.0, 0.0, 10.0], [1e40, 1e-20, 1e6])
+    assert M[0] == np.inf and np.isnan(M[1]) and np.isfinite(M[2])
+
+
+def test_n_above_matches_interp():
+    hmf = halo_mass_function()
+    z = np.array([0.0, 5.0, 10.0])
+    M = 10**np.array([[2.0, 9.0, 12.3], [14.0, 16.9, 18.0]])
+    lnM, cum = hmf._cumulative(z, 'sheth-tormen')
+    ln_cum = np.log(np.maximum(cum, 1e-300))
+    ref = np.exp([np.interp(np.log(M), lnM, row) for row in ln_cum])
+    np.testing.assert_allclose(hmf.n_above(M, z), ref, rtol=1e-12)
+
+
+def test_modified_growth_follows_module_geom(monkeypatch):
+    table = modified_growth_table()
+    monkeypatch.setattr(core, 'GEOM', 3.0)
+    assert modified_growth_table() is not table
+    assert modified_growth_table().cosmo.GEOM == 3.0
+
+
+def test_modified_growth_stops_at_breakdown():
+    table = modified_growth_table()
+    M = 1e11
+    z_nl = table.nonlinear_redshift(M)
+    assert np.isfinite(z_nl)
+    assert table.sigma(M, z_nl * 1.01) < NONLINEAR_SIGMA
+    assert np.isnan(table.growth(M, z_nl * 0.99))
+
+
+def test_modified_growth_starts_at_decoupling():
+    table = modified_growth_table()
+    M = 10.0**np.array([8.0, 11.0, 13.0])
+    hmf = halo_mass_function()
+    # Standard growth up to decoupling, enhanced right after
+    for z in (2000.0, Z_DECOUPLING):
+        np.testing.assert_allclose(table.sigma(M, z), hmf.sigma(M, z), rtol=1e-6)
+    assert np.all(table.enhancement(M, 0.9 * Z_DECOUPLING) > 1.01)
+    # Smaller scales go nonlinear first, all before the JWST redshifts
+    z_nl = table.nonlinear_redshift(M)
+    assert np.all(np.diff(z_nl) < 0) and np.all(z_nl > 20)
+    # Without the modification (a_0 -> 0) nothing leaves linear theory early
+    newtonian = modified_growth_table(jmi.get_cosmology().replace(GEOM=1e12))
+    np.testing.assert_allclose(newtonian.enhancement(M, 12.0), 1.0, rtol=1e-3)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import jwst_modified_inertia as jmi
+from jwst_modified_inertia.core import Msun
+from jwst_modified_inertia.infall import infall_collapse
+
+M = np.array([1e9, 1e11]) * Msun
+
+
+@pytest.fixture
+def newtonian():
+    # a_0 -> 0: every shell is in the Newtonian regime
+    return jmi.get_cosmology().replace(GEOM=1e12)
+
+
+def test_newtonian_limit_is_the_free_fall_time(newtonian):
+    r = infall_collapse(M, 10.0, 5.0, n_shells=32, cosmo=newtonian)
+    # A uniform sphere collapses homologously: all shells arrive together
+    np.testing.assert_allclose(r['t_collapse_Myr'], r['t_ff_std_Myr'], rtol=1e-3)
+    np.testing.assert_allclose(r['t_half_Myr'], r['t_ff_std_Myr'], rtol=1e-3)
+    assert np.all(np.isinf(r['t_cross_Myr']))
+
+
+def test_converges_with_the_step(newtonian):
+    err = []
+    for courant in (0.05, 0.025, 0.0125, 0.00625):
+        r = infall_collapse(M, 10.0, 5.0, n_shells=8, courant=courant,
+                            cosmo=newtonian)
+        err.append(np.max(np.abs(r['t_collapse_Myr'] / r['t_ff_std_Myr'] - 1)))
+    assert all(a > 1.5 * b for a, b in zip(err, err[1:]))
+
+    # Modified regime: against a fine step
+    ref = infall_collapse(M, 10.0, 5.0, n_shells=8, courant=0.004)['t_collapse_Myr']
+    err = [np.max(np.abs(infall_collapse(M, 10.0, 5.0, n_shells=8,
+                                         courant=c)['t_collapse_Myr'] / ref - 1))
+           for c in (0.05, 0.0125)]
+    assert err[0] < 2e-3 and err[1] < err[0] / 2
+
+
+def test_modified_collapse_is_faster_and_near_the_bracket():
+    r = infall_collapse(M, 10.0, 5.0, n_shells=16)
+    assert np.all(r['t_collapse_Myr'] < 0.5 * r['t_ff_std_Myr'])
+    np.testing.assert_allclose(r['bracket_error'],
+                               r['t_bracket_Myr'] / r['t_collapse_Myr'] - 1)
+    assert np.all(np.abs(r['bracket_error']) < 0.05)
+
+
+@pytest.mark.parametrize('geom', [6.0, 1e12])
+def test_shell_crossing(geom):
+    # Density rising outwards: outer shells fall in faster and overtake
+    cosmo = jmi.get_cosmology().replace(GEOM=geom)
+    r = infall_collapse(M, 10.0, 5.0, n_shells=32, gamma=-1.0, cosmo=cosmo)
+    assert np.all(np.isfinite(r['t_cross_Myr']))
+    assert np.all(r['t_cross_Myr'] > 0)
+    assert np.all(r['t_cross_Myr'] < r['t_collapse_Myr'])
+    assert np.all(np.isfinite(r['t_collapse_Myr']))
+
+
+def test_broadcast_shape():
+    r = infall_collapse(M[:, None], np.array([8.0, 12.0, 16.0]), 5.0, n_shells=4)
+    assert r['t_collapse_Myr'].shape == (2, 3)
+    one = infall_collapse(M[1], 12.0, 5.0, n_shells=4)
+    assert float(one['t_collapse_Myr']) == pytest.approx(r['t_collapse_Myr'][1, 1],
+                                                         rel=1e-12)
@@ -0,0 +1,60 @@
+import numpy as np
+
+from jwst_modified_inertia import instrument
+from jwst_modified_inertia.instrument import kernel, profile, section
+
+
+@kernel('square')
+def square(x):
+    return x * x
+
+
+@kernel()
+def outer(x):
+    return square(x) + 1
+
+
+def test_calls_and_sections_are_recorded():
+    x = np.arange(50.0)
+    with profile() as trace:
+        assert instrument.enabled()
+        square(x)
+        with section('a'):
+            outer(x)
+            with section('b'):
+                square(np.arange(7.0))
+                square(np.arange(7.0))
+    d = trace.to_dict()
+    assert not instrument.enabled()
+
+    kernels = {(k['section'], k['kernel']): k for k in d['kernels']}
+    assert kernels[('', 'square')]['calls'] == 1
+    assert kernels[('', 'square')]['points'] == 50
+    assert kernels[('a', 'outer')]['calls'] == 1
+    assert kernels[('a', 'square')]['calls'] == 1
+    assert kernels[('a/b', 'square')]['calls'] == 2
+    assert kernels[('a/b', 'square')]['points'] == 14
+    assert d['totals']['square']['calls'] == 4
+    assert set(d['sections']) == {'a', 'a/b'}
+    assert d['sections']['a']['calls'] == 1
+    # Times are inclusive: a section covers its subsections and outer its
+    # call of square
+    assert d['sections']['a']['seconds'] >= d['sections']['a/b']['seconds'] >= 0
+    assert kernels[('a', 'outer')]['seconds'] >= kernels[('a', 'square')]['seconds']
+    assert d['total_seconds'] >= d['sections']['a']['seconds']
+
+
+def test_disabled_is_a_no_op():
+    x = np.arange(5.0)
+    assert not instrument.enabled()
+    with section('ignored'):
+        result = outer(x)
+    np.testing.assert_array_equal(result, x * x + 1)
+    assert instrument._trace is None
+    assert outer.__name__ == 'outer' and outer.__wrapped__(x).tolist() == result.tolist()
+
+    # Calls made before profiling started are not picked up
+    with profile() as trace:
+        pass
+    d = trace.to_dict()
+    assert d['kernels'] == [] and d['sections'] == {} and d['totals'] == {}
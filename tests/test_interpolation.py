@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from jwst_modified_inertia.interpolation import INTERPOLATIONS, get_interpolation
+
+
+@pytest.mark.parametrize('name', sorted(INTERPOLATIONS) + ['n:1.5'])
+def test_mu_nu_are_inverse(name):
+    f = get_interpolation(name)
+    y = np.logspace(-6, 6, 241)
+    x = y * f.nu(y)
+    np.testing.assert_allclose(x * f.mu(x), y, rtol=1e-11)
+
+
+@pytest.mark.parametrize('name', sorted(INTERPOLATIONS))
+def test_limits(name):
+    f = get_interpolation(name)
+    assert f.nu(1e8) == pytest.approx(1.0, abs=1e-3)
+    # Deep-MOND: a = sqrt(g a_0)
+    assert f.nu(1e-10) * np.sqrt(1e-10) == pytest.approx(1.0, rel=1e-3)
+
+
+def test_bad_names():
+    with pytest.raises(ValueError):
+        get_interpolation('nope')
+    with pytest.raises(ValueError):
+        get_interpolation('simple:2')
@@ -0,0 +1,26 @@
+import numpy as np
+
+from jwst_modified_inertia import montecarlo
+
+
+def test_redshift_draws_truncated_not_reset(monkeypatch):
+    seen = []
+    batch = montecarlo.collapse_timescale_batch
+
+    def spy(M, z, *args, **kwargs):
+        seen.append(np.array(z))
+        return batch(M, z, *args, **kwargs)
+
+    monkeypatch.setattr(montecarlo, 'collapse_timescale_batch', spy)
+    z0, z_err = 0.05, 0.1
+    montecarlo._run_chunk(np.random.SeedSequence(1), np.array([z0]), np.array([9.0]),
+                          np.array([0.3]), 200_000, 0.1, 5.0, z_err, 30.0, None)
+    z = seen[0].ravel()
+    assert np.all(z > 0)
+    # Not piled up on z0
+    assert np.mean(z == z0) < 1e-4
+    # Mean of the normal truncated at 0: z0 + z_err phi(a) / (1 - Phi(a)), a = -z0/z_err
+    from scipy.stats import norm
+    a = -z0 / z_err
+    expected = z0 + z_err * norm.pdf(a) / norm.sf(a)
+    assert abs(z.mean() - expected) < 5 * z_err / np.sqrt(z.size)
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+
+import jwst_modified_inertia as jmi
+from jwst_modified_inertia import result_cache
+from jwst_modified_inertia.analysis import analysis_data, run_analysis
+from jwst_modified_inertia.result_cache import ResultCache, cache_key
+
+
+def test_key_follows_inputs(monkeypatch):
+    cosmo = jmi.get_cosmology()
+    galaxies = list(jmi.jwst_galaxies)
+    key = cache_key('analysis', cosmology=cosmo, galaxies=galaxies)
+    assert key == cache_key('analysis', cosmology=cosmo.replace(), galaxies=list(galaxies))
+    assert key != cache_key('analysis', cosmology=cosmo.replace(GEOM=5.0),
+                            galaxies=galaxies)
+    assert key != cache_key('analysis', cosmology=cosmo.replace(H0_km=70.0),
+                            galaxies=galaxies)
+    assert key != cache_key('analysis', cosmology=cosmo, galaxies=galaxies[1:])
+    changed = [galaxies[0][:2] + (galaxies[0][2] + 0.1,) + galaxies[0][3:]] + galaxies[1:]
+    assert key != cache_key('analysis', cosmology=cosmo, galaxies=changed)
+    monkeypatch.setattr(result_cache, 'code_version', lambda: 'other')
+    assert key != cache_key('analysis', cosmology=cosmo, galaxies=galaxies)
+
+
+def report(cache):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        run_analysis(cache=cache)
+    return out.getvalue()
+
+
+def test_hit_matches_fresh_run(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    fresh = report(None)
+    assert report(cache) == fresh
+    entries = cache.info()['entries']
+    assert entries > 0
+    # Second run: served from disk, nothing new written
+    assert report(cache) == fresh
+    assert cache.info()['entries'] == entries
+
+    tables = analysis_data(cache=cache)
+    for section, cols in analysis_data().items():
+        for name, v in cols.items():
+            np.testing.assert_array_equal(tables[section][name], v)
+
+
+def test_eviction_removes_oldest_by_mtime(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=2**40)
+    for i, key in enumerate(('a', 'b', 'c')):
+        cache.put(key, {'x': np.full(1000, i)})
+        os.utime(cache._path(key), (1000.0 * (i + 1),) * 2)
+    # A hit refreshes the mtime: 'a' becomes the newest
+    assert cache.get('a')['x'][0] == 0
+    size = os.path.getsize(cache._path('a'))
+    cache.evict(max_bytes=2 * size)
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_clear_empties_directory(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for key in ('a', 'b'):
+        cache.put(key, {'x': np.arange(10)})
+    assert cache.info()['entries'] == 2
+    cache.clear()
+    assert cache.info()['entries'] == 0
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from scipy import integrate
+
+import jwst_modified_inertia as jmi
+from jwst_modified_inertia.halo_mass_function import halo_mass_function
+from jwst_modified_inertia.survey import (
+    DEG2_TO_SR, CountsModel, compare_counts, distance_table,
+)
+
+
+def test_distance_table_accuracy():
+    assert distance_table().accuracy() < 1e-10
+
+
+def test_distance_table_shared_across_geom():
+    assert distance_table() is distance_table(jmi.get_cosmology().replace(GEOM=3.0))
+
+
+@pytest.fixture(scope='module')
+def model():
+    return CountsModel()
+
+
+def test_counts_match_quadrature(model):
+    table = distance_table()
+    hmf = halo_mass_function()
+    cosmo = jmi.get_cosmology()
+    M_halo = 10**10 / (0.1 * cosmo.fb)
+    exact = integrate.quad(lambda z: table.differential_volume(z) * hmf.n_above(M_halo, z),
+                           7.0, 8.5)[0] * 0.03 * DEG2_TO_SR
+    counts = model.counts(0.03, [7.0, 8.5], 10.0)['standard']
+    assert counts[0, 0] == pytest.approx(exact, rel=0.02)
+
+
+def test_counts_vectorized_over_surveys(model):
+    area = np.array([0.01, 0.1, 0.5])
+    logM = np.array([9.0, 9.5, 10.0])
+    edges = np.array([6.0, 8.0, 10.0, 12.0])
+    out = model.counts(area, edges, logM)
+    assert out['formed'].shape == (3, 3)
+    for s in range(3):
+        one = model.counts(area[s], edges, logM[s])
+        np.testing.assert_allclose(out['formed'][s], one['formed'][0])
+    assert np.all(out['formed'] <= out['standard'] * (1 + 1e-12))
+    # Counts scale with area
+    np.testing.assert_allclose(out['volume_Mpc3'][1] / out['volume_Mpc3'][0], 10.0)
+
+
+def test_counts_outside_table(model):
+    with pytest.raises(ValueError):
+        model.counts(0.1, [18.0, 25.0], 9.0)
+
+
+def test_compare_counts():
+    r = compare_counts([1.0, 10.0], [0, 10])
+    assert r['p_excess'][0] == 1.0
+    assert 0 < r['p_deficit'][1] < 1
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from jwst_modified_inertia.thresholds import (
+    max_formable_mass, min_overdensity, n_collapses,
+)
+
+
+def test_min_overdensity_unreachable_is_inf():
+    # N at the top of the range (delta = 1e6) is below k = 1
+    assert n_collapses(9.0, 29.99, overdensity=1e6) < 1
+    assert min_overdensity(9.0, 29.99) == np.inf
+
+
+def test_min_overdensity_above_z_start_is_inf():
+    assert min_overdensity(9.0, 40.0) == np.inf
+
+
+def test_min_overdensity_lower_edge_suffices():
+    assert n_collapses(7.0, 5.0, overdensity=0.01) >= 0.5
+    assert min_overdensity(7.0, 5.0, k=0.5) == pytest.approx(0.01)
+
+
+def test_min_overdensity_interior_root():
+    delta = min_overdensity(9.0, 10.0)
+    assert 0.01 < delta < 1e6
+    assert n_collapses(9.0, 10.0, overdensity=delta) == pytest.approx(1.0, rel=1e-8)
+
+
+def test_max_formable_mass_edges_and_root():
+    assert max_formable_mass(40.0) == -np.inf
+    assert max_formable_mass(5.0, k=1e-9) == np.inf
+    logM = max_formable_mass(10.0, k=3.0)
+    assert 4.0 < logM < 16.0
+    assert n_collapses(logM, 10.0) == pytest.approx(3.0, rel=1e-8)
+
+
+def test_thresholds_broadcast():
+    out = min_overdensity(np.array([7.0, 9.0, 9.0]), np.array([5.0, 29.99, 10.0]),
+                          k=np.array([0.5, 1.0, 1.0]))
+    assert out.shape == (3,)
+    assert out[0] == pytest.approx(0.01) and out[1] == np.inf
+    assert np.isfinite(out[2])